@@ -14,6 +14,14 @@ app.register_blueprint(app_views, url_prefix='/api/v1')
 cors = CORS(app, resources={r'/*': {'origins': '0.0.0.0'}})
 
 
+@app.before_request
+def refresh_storage():
+    """Reads what other processes wrote to the storage since the last
+    request, before the request is served.
+    """
+    storage.refresh()
+
+
 @app.teardown_appcontext
 def teardown_db(error):
     """Closes the database again at the end of the request.
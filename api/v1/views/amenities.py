@@ -4,6 +4,9 @@
 from flask import abort, jsonify, request
 from flask.views import MethodView
 from api.v1.views import app_views
+from api.v1.views.conditional import check_class, check_object
+from api.v1.views.pagination import is_paginated, paginate
+from api.v1.views.streaming import is_streamed, stream
 from models import storage
 from models.amenity import Amenity
 
@@ -19,13 +22,21 @@ class AmenityAPI(MethodView):
         if amenity_id:
             return jsonify(self.get_amenity(amenity_id)), 200
 
+        check_class(Amenity)
+
+        if is_paginated():
+            return paginate(Amenity)
+
+        if is_streamed():
+            return stream(Amenity)
+
         return jsonify(self.get_amenities()), 200
 
     def get_amenities(self):
         """Retrieves the list of all Amenity objects
         """
         amenities_list = list()
-        amenities = storage.all(Amenity).values()
+        amenities = list(storage.all(Amenity).values())
 
         for amenity in amenities:
             amenities_list.append(amenity.to_dict())
@@ -43,6 +54,7 @@ class AmenityAPI(MethodView):
         if amenity is None:
             abort(404)
 
+        check_object(amenity)
         return amenity.to_dict()
 
     def post(self):
@@ -68,15 +80,13 @@ class AmenityAPI(MethodView):
         if not req_data:
             abort(400, 'Not a JSON')
 
-        key = Amenity.__name__ + "." + amenity_id
-        all_amenities = storage.all(Amenity)
-        amenity_update = all_amenities.get(key)
+        amenity_update = storage.get(Amenity, amenity_id)
 
         if amenity_update is None:
             abort(404)
 
         amenity_update.name = req_data.get('name')
-        storage.save()
+        amenity_update.save()
         return jsonify(amenity_update.to_dict()), 200
 
     def delete(self, amenity_id):
@@ -4,6 +4,9 @@
 from flask import abort, jsonify, request
 from flask.views import MethodView
 from api.v1.views import app_views
+from api.v1.views.conditional import check_class, check_object
+from api.v1.views.pagination import is_paginated, paginate
+from api.v1.views.streaming import is_streamed, stream
 from models import storage
 from models.state import State
 from models.city import City
@@ -18,6 +21,17 @@ class CityAPI(MethodView):
         or a single City object
         """
         if state_id:
+            if storage.get(State, state_id) is None:
+                abort(404)
+
+            check_class(City)
+
+            if is_paginated():
+                return paginate(City, "state_id", state_id)
+
+            if is_streamed():
+                return stream(City, "state_id", state_id)
+
             return jsonify(self.get_cities(state_id)), 200
 
         return jsonify(self.get_city(city_id)), 200
@@ -27,10 +41,12 @@ class CityAPI(MethodView):
         """
         cities_list = list()
 
-        if storage.get(State, state_id) is None:
+        state = storage.get(State, state_id, load=["cities"])
+
+        if state is None:
             abort(404)
 
-        cities_state = storage.get(State, state_id).cities
+        cities_state = state.cities
 
         for city in cities_state:
             cities_list.append(city.to_dict())
@@ -44,15 +60,13 @@ class CityAPI(MethodView):
         raise a 404 error
         """
         if city_id is not None:
-            all_cities = storage.all(City)
+            city = storage.get(City, city_id)
 
-            key = City.__name__ + "." + city_id
-
-            if all_cities.get(key) is None:
+            if city is None:
                 abort(404)
-            city = all_cities.get(key).to_dict()
 
-            return city
+            check_object(city)
+            return city.to_dict()
 
     def post(self, state_id):
         """ Creates a new City
@@ -89,7 +103,7 @@ class CityAPI(MethodView):
             abort(404)
 
         city_update.name = req_data.get('name')
-        storage.save()
+        city_update.save()
         return jsonify(city_update.to_dict()), 200
 
     def delete(self, city_id):
@@ -0,0 +1,78 @@
+#!/usr/bin/python3
+"""Conditional module
+
+GET routes send an ETag and a Last-Modified header, and answer a request
+whose If-None-Match or If-Modified-Since header shows that the client
+already has the current version with 304 Not Modified, before reading
+or serializing anything else. The version of a list comes from the
+generation the storage keeps for the class of its objects, so it needs
+no scan, and from its representation: a JSON array, a streamed JSON array or NDJSON,
+picked by the query string and the Accept header, which list responses
+name in their Vary header. The version of an object comes from its id
+and updated_at, and from the generation of its class too, since a
+database may keep updated_at to the second only.
+"""
+from datetime import timezone
+from api.v1.views.pagination import is_paginated
+from api.v1.views.streaming import is_ndjson, is_streamed
+from flask import Response, abort, after_this_request, request
+import hashlib
+from models import storage
+from werkzeug.http import http_date, is_resource_modified, quote_etag
+
+
+def check(tag, last_modified=None, vary=None):
+    """Answers with 304 Not Modified when the client has the version tag
+    of the resource, last modified at last_modified; otherwise adds the
+    ETag and Last-Modified headers to the response
+
+    vary names the request header the representation depends on, if
+    any, for the Vary header of both responses.
+    """
+    etag = hashlib.sha1(tag.encode()).hexdigest()
+    headers = {"ETag": quote_etag(etag)}
+    if last_modified is not None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+        headers["Last-Modified"] = http_date(last_modified)
+    if not is_resource_modified(request.environ, etag=etag,
+                                last_modified=last_modified):
+        response = Response(status=304, headers=headers)
+        if vary is not None:
+            response.vary.add(vary)
+        abort(response)
+
+    @after_this_request
+    def add_headers(response):
+        """adds the headers of the version to a successful response"""
+        if response.status_code == 200:
+            response.headers.update(headers)
+            if vary is not None:
+                response.vary.add(vary)
+        return response
+
+
+def representation():
+    """returns the name of the representation of the list requested"""
+    if is_paginated():
+        return "json"
+    if is_ndjson():
+        return "ndjson"
+    if is_streamed():
+        return "stream"
+    return "json"
+
+
+def check_object(obj):
+    """Answers with 304 Not Modified when the client has obj as it is"""
+    tag = storage.generation(obj.__class__)[0]
+    check("{}.{}.{}:{}".format(obj.__class__.__name__, obj.id,
+                               obj.updated_at.isoformat(), tag),
+          obj.updated_at)
+
+
+def check_class(cls):
+    """Answers with 304 Not Modified when no object of cls changed since
+    the client got the list"""
+    tag, last_modified = storage.generation(cls)
+    check("{}:{}:{}".format(cls.__name__, tag, representation()),
+          last_modified, "Accept")
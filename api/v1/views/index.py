@@ -1,15 +1,9 @@
 #!/usr/bin/python3
 """Index module
 """
-from flask import jsonify
-from api.v1.views import app_views
+from flask import abort, jsonify
+from api.v1.views import app_views, response_cache
 from models import storage
-from models.amenity import Amenity
-from models.city import City
-from models.place import Place
-from models.review import Review
-from models.state import State
-from models.user import User
 
 
 @app_views.route('/status')
@@ -23,10 +17,40 @@ def get_status():
 def get_stats():
     """GET the number of each objects by type
     """
-    count_objs = {"amenities": storage.count(Amenity),
-                  "cities": storage.count(City),
-                  "places": storage.count(Place),
-                  "reviews": storage.count(Review),
-                  "states": storage.count(State),
-                  "users": storage.count(User)}
+    counts = storage.counts()
+    count_objs = {"amenities": counts["Amenity"],
+                  "cities": counts["City"],
+                  "places": counts["Place"],
+                  "reviews": counts["Review"],
+                  "states": counts["State"],
+                  "users": counts["User"]}
     return jsonify(count_objs)
+
+
+@app_views.route('/stats/pool')
+def get_pool_stats():
+    """GET the state and statistics of the database connection pool
+    """
+    if not hasattr(storage, "pool_stats"):
+        abort(404)
+    return jsonify(storage.pool_stats())
+
+
+@app_views.route('/stats/cache')
+def get_cache_stats():
+    """GET the counters of the storage object cache
+    """
+    stats = getattr(storage, "cache_stats", lambda: None)()
+    if stats is None:
+        abort(404)
+    return jsonify(stats)
+
+
+@app_views.route('/stats/responses')
+def get_response_cache_stats():
+    """GET the counters and hit rate of the API response cache
+    """
+    stats = response_cache.stats()
+    if stats is None:
+        abort(404)
+    return jsonify(stats)
@@ -0,0 +1,69 @@
+#!/usr/bin/python3
+"""Pagination module
+
+List routes return a single page when the request has a limit or a
+cursor query parameter: up to limit objects (100 by default, 1000 at
+most) ordered by id, and a Link header with rel="next" pointing to the
+following page while there is one. The cursor is opaque to clients; it
+holds the id of the last object of the previous page.
+"""
+import base64
+import binascii
+from flask import abort, jsonify, request
+from models import storage
+from urllib.parse import urlencode
+
+# integer - number of objects of a page when only a cursor is given
+default_limit = 100
+# integer - largest number of objects of a page
+max_limit = 1000
+
+
+def is_paginated():
+    """tells whether the request asks for a single page"""
+    return "limit" in request.args or "cursor" in request.args
+
+
+def encode_cursor(id):
+    """returns the cursor of the page starting after the object id"""
+    return base64.urlsafe_b64encode(id.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """returns the id held by cursor, or aborts with a 400 error unless
+    cursor is exactly what encode_cursor() returns for that id"""
+    try:
+        id = base64.b64decode(cursor + "=" * (-len(cursor) % 4),
+                              altchars=b"-_", validate=True).decode()
+    except (binascii.Error, ValueError):
+        abort(400, 'Invalid cursor')
+    if encode_cursor(id) != cursor:
+        abort(400, 'Invalid cursor')
+    return id
+
+
+def paginate(cls, attr=None, value=None):
+    """Returns the response of the page of the objects of cls requested
+
+    When attr is given, only the objects whose attribute attr equals
+    value are listed.
+    """
+    try:
+        limit = int(request.args.get("limit", default_limit))
+    except ValueError:
+        abort(400, 'Invalid limit')
+    if limit < 1 or limit > max_limit:
+        abort(400, 'Invalid limit')
+    after = None
+    if request.args.get("cursor"):
+        after = decode_cursor(request.args["cursor"])
+    objs = storage.page(cls, limit + 1, after, attr, value)
+    headers = {}
+    if len(objs) > limit:
+        objs = objs[:limit]
+        args = request.args.to_dict()
+        args["limit"] = limit
+        args["cursor"] = encode_cursor(objs[-1].id)
+        headers["Link"] = '<{}?{}>; rel="next"'.format(request.base_url,
+                                                       urlencode(args))
+    return jsonify([obj.to_dict() for obj in objs]), 200, headers
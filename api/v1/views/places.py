@@ -4,6 +4,9 @@
 from flask import abort, jsonify, request
 from flask.views import MethodView
 from api.v1.views import app_views
+from api.v1.views.conditional import check_class, check_object
+from api.v1.views.pagination import is_paginated, paginate
+from api.v1.views.streaming import is_streamed, stream
 from models import storage
 from models.place import Place
 from models.city import City
@@ -19,6 +22,17 @@ class PlaceAPI(MethodView):
         or a single Place object
         """
         if city_id:
+            if storage.get(City, city_id) is None:
+                abort(404)
+
+            check_class(Place)
+
+            if is_paginated():
+                return paginate(Place, "city_id", city_id)
+
+            if is_streamed():
+                return stream(Place, "city_id", city_id)
+
             return jsonify(self.get_places(city_id)), 200
 
         return jsonify(self.get_place(place_id)), 200
@@ -29,10 +43,12 @@ class PlaceAPI(MethodView):
         """
         places_list = list()
 
-        if storage.get(City, city_id) is None:
+        city = storage.get(City, city_id, load=["places"])
+
+        if city is None:
             abort(404)
 
-        places_city = storage.get(City, city_id).places
+        places_city = city.places
 
         for place in places_city:
             places_list.append(place.to_dict())
@@ -47,16 +63,13 @@ class PlaceAPI(MethodView):
         """
 
         if place_id is not None:
-            all_places = storage.all(Place)
+            place = storage.get(Place, place_id)
 
-            key = Place.__name__ + "." + place_id
-
-            if all_places.get(key) is None:
+            if place is None:
                 abort(404)
 
-            place = all_places.get(key).to_dict()
-
-            return place
+            check_object(place)
+            return place.to_dict()
 
     def post(self, city_id):
         """ Creates a new Place
@@ -4,6 +4,9 @@
 from flask import abort, jsonify, request
 from flask.views import MethodView
 from api.v1.views import app_views
+from api.v1.views.conditional import check_class, check_object
+from api.v1.views.pagination import is_paginated, paginate
+from api.v1.views.streaming import is_streamed, stream
 from models import storage
 from models.place import Place
 from models.review import Review
@@ -18,6 +21,17 @@ class ReviewAPI(MethodView):
         or a single Review object
         """
         if place_id:
+            if storage.get(Place, place_id) is None:
+                abort(404)
+
+            check_class(Review)
+
+            if is_paginated():
+                return paginate(Review, "place_id", place_id)
+
+            if is_streamed():
+                return stream(Review, "place_id", place_id)
+
             return jsonify(self.get_reviews(place_id)), 200
 
         return jsonify(self.get_review(review_id)), 200
@@ -27,7 +41,7 @@ class ReviewAPI(MethodView):
         of a Place
         """
         reviews_list = list()
-        place = storage.get(Place, place_id)
+        place = storage.get(Place, place_id, load=["reviews"])
 
         if place is None:
             abort(404)
@@ -50,6 +64,7 @@ class ReviewAPI(MethodView):
         if review is None:
             abort(404)
 
+        check_object(review)
         return review.to_dict()
 
     def post(self, place_id):
@@ -0,0 +1,130 @@
+#!/usr/bin/python3
+"""Response cache module
+
+When HBNB_API_CACHE_SIZE is above 0, the bodies of up to that many GET
+responses are kept for HBNB_API_CACHE_TTL seconds (60 by default), by
+path and query string, and served again without going through the
+storage or to_dict(). Streamed responses, and bodies larger than
+max_body bytes, are not kept.
+
+Each route depends on the classes listed for it in dependencies, and
+each entry keeps the generations those classes had before the response
+was built. An entry is dropped as soon as one of them moved, so any
+write to an object of those classes, through this process or another
+one sharing the storage, invalidates it.
+"""
+from flask import Response, g, request
+from api.v1.views import app_views
+from api.v1.views.streaming import is_streamed
+from models import storage
+from models.engine.cache import LRUCache
+from os import getenv
+import threading
+
+# tuple - names of the classes the GET responses of each endpoint depend
+# on, by endpoint and names of the URL arguments given
+dependencies = {
+    ("app_views.get_stats", ()): ("Amenity", "City", "Place", "Review",
+                                  "State", "User"),
+    ("app_views.state_api", ()): ("State",),
+    ("app_views.state_api", ("state_id",)): ("State",),
+    ("app_views.city_api", ("state_id",)): ("City", "State"),
+    ("app_views.city_api", ("city_id",)): ("City",),
+    ("app_views.amenity_api", ()): ("Amenity",),
+    ("app_views.amenity_api", ("amenity_id",)): ("Amenity",),
+    ("app_views.user_api", ()): ("User",),
+    ("app_views.user_api", ("user_id",)): ("User",),
+    ("app_views.place_api", ("city_id",)): ("Place", "City"),
+    ("app_views.place_api", ("place_id",)): ("Place",),
+    ("app_views.review_api", ("place_id",)): ("Review", "Place"),
+    ("app_views.review_api", ("review_id",)): ("Review",),
+}
+# list - headers kept along with the bodies
+kept_headers = ["Content-Type", "ETag", "Last-Modified", "Link", "Vary"]
+# integer - size in bytes of the largest body kept
+max_body = 1024 * 1024
+
+cache = None
+if int(getenv('HBNB_API_CACHE_SIZE', 0)) > 0:
+    cache = LRUCache(int(getenv('HBNB_API_CACHE_SIZE')),
+                     float(getenv('HBNB_API_CACHE_TTL', 60)))
+# dictionary - requests served from the cache, requests not found in it,
+# and entries dropped because a class they depend on changed
+counters = {"hits": 0, "misses": 0, "invalidations": 0}
+counters_lock = threading.Lock()
+
+
+def count(*names):
+    """adds one to each counter in names"""
+    with counters_lock:
+        for name in names:
+            counters[name] += 1
+
+
+def names():
+    """returns the names of the classes the response to the request
+    depends on, or None when it is not cached"""
+    if cache is None or request.method != "GET" or is_streamed():
+        return None
+    args = tuple(sorted(name for name, value in
+                        (request.view_args or {}).items()
+                        if value is not None))
+    return dependencies.get((request.endpoint, args))
+
+
+def generations(names):
+    """returns the current generation tag of each class in names"""
+    return {name: generation[0]
+            for name, generation in storage.generations(names).items()}
+
+
+@app_views.before_request
+def serve_cached():
+    """Serves the response kept for the request, if it is still current
+    """
+    depends = names()
+    if depends is None:
+        return None
+    current = generations(depends)
+    entry = cache.get(request.full_path)
+    if entry is not None:
+        body, headers, tags = entry
+        if tags == current:
+            count("hits")
+            response = Response(body, 200, headers)
+            return response.make_conditional(request)
+        cache.pop(request.full_path)
+        count("invalidations", "misses")
+    else:
+        count("misses")
+    g.response_cache_tags = current
+    return None
+
+
+@app_views.after_request
+def keep_response(response):
+    """Keeps a successful response, with the generations read before it
+    was built"""
+    tags = g.pop("response_cache_tags", None)
+    if tags is None or response.status_code != 200 or \
+       response.is_streamed:
+        return response
+    body = response.get_data()
+    if len(body) <= max_body:
+        headers = [(name, response.headers[name]) for name in kept_headers
+                   if name in response.headers]
+        cache.put(request.full_path, (body, headers, tags))
+    return response
+
+
+def stats():
+    """returns the size, settings, counters and hit rate of the cache, or
+    None without one"""
+    if cache is None:
+        return None
+    stats = cache.stats()
+    with counters_lock:
+        stats.update(counters)
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+    return stats
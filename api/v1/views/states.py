@@ -4,6 +4,9 @@
 from flask import abort, jsonify, request
 from flask.views import MethodView
 from api.v1.views import app_views
+from api.v1.views.conditional import check_class, check_object
+from api.v1.views.pagination import is_paginated, paginate
+from api.v1.views.streaming import is_streamed, stream
 from models import storage
 from models.state import State
 
@@ -19,13 +22,21 @@ class StateAPI(MethodView):
         if state_id:
             return jsonify(self.get_state(state_id)), 200
 
+        check_class(State)
+
+        if is_paginated():
+            return paginate(State)
+
+        if is_streamed():
+            return stream(State)
+
         return jsonify(self.get_states()), 200
 
     def get_states(self):
         """Retrieves the list of all State objects
         """
         states_list = list()
-        states = storage.all(State).values()
+        states = list(storage.all(State).values())
 
         for state in states:
             states_list.append(state.to_dict())
@@ -43,6 +54,7 @@ class StateAPI(MethodView):
         if state is None:
             abort(404)
 
+        check_object(state)
         return state.to_dict()
 
     def post(self):
@@ -74,7 +86,7 @@ class StateAPI(MethodView):
             abort(404)
 
         state_update.name = req_data.get('name')
-        storage.save()
+        state_update.save()
         return jsonify(state_update.to_dict()), 200
 
     def delete(self, state_id):
@@ -0,0 +1,73 @@
+#!/usr/bin/python3
+"""Streaming module
+
+List routes stream their objects instead of building the whole list
+first when the request has the stream=true query parameter, as a chunked
+JSON array, or prefers application/x-ndjson in its Accept header, as one
+JSON object per line. The objects are read from the storage in batches
+while the response is sent, so neither the time to the first byte nor
+the memory used grows with the collection.
+"""
+from flask import Response, json, request, stream_with_context
+from models import storage
+
+# integer - number of objects read from the storage at a time
+batch_size = 1000
+
+
+def is_ndjson():
+    """tells whether the request prefers NDJSON to JSON"""
+    return request.accept_mimetypes.best_match(
+        ["application/json", "application/x-ndjson"]) == \
+        "application/x-ndjson"
+
+
+def is_streamed():
+    """tells whether the request asks for a streamed list"""
+    return request.args.get("stream") in ("1", "true") or is_ndjson()
+
+
+def objects(cls, attr=None, value=None):
+    """Yields the objects of cls, those whose attribute attr equals value
+    when attr is given, a batch at a time
+    """
+    if attr is None:
+        for obj in storage.iter(cls, batch_size):
+            yield obj
+        return
+    after = None
+    while True:
+        objs = storage.page(cls, batch_size, after, attr, value)
+        for obj in objs:
+            yield obj
+        if len(objs) < batch_size:
+            return
+        after = objs[-1].id
+
+
+def ndjson(objs):
+    """Yields the lines of the NDJSON document of objs"""
+    for obj in objs:
+        yield json.dumps(obj.to_dict()) + "\n"
+
+
+def json_array(objs):
+    """Yields the chunks of the JSON array of objs"""
+    yield "["
+    for i, obj in enumerate(objs):
+        yield (", " if i else "") + json.dumps(obj.to_dict())
+    yield "]\n"
+
+
+def stream(cls, attr=None, value=None):
+    """Returns the streamed response listing the objects of cls
+
+    When attr is given, only the objects whose attribute attr equals
+    value are listed.
+    """
+    objs = objects(cls, attr, value)
+    if is_ndjson():
+        return Response(stream_with_context(ndjson(objs)),
+                        mimetype="application/x-ndjson")
+    return Response(stream_with_context(json_array(objs)),
+                    mimetype="application/json")
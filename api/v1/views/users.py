@@ -4,6 +4,9 @@
 from flask import abort, jsonify, request
 from flask.views import MethodView
 from api.v1.views import app_views
+from api.v1.views.conditional import check_class, check_object
+from api.v1.views.pagination import is_paginated, paginate
+from api.v1.views.streaming import is_streamed, stream
 from models import storage
 from models.user import User
 
@@ -19,13 +22,21 @@ class UserAPI(MethodView):
         if user_id:
             return jsonify(self.get_user(user_id)), 200
 
+        check_class(User)
+
+        if is_paginated():
+            return paginate(User)
+
+        if is_streamed():
+            return stream(User)
+
         return jsonify(self.get_users()), 200
 
     def get_users(self):
         """Retrieves the list of all User objects
         """
         users_list = list()
-        users = storage.all(User).values()
+        users = list(storage.all(User).values())
 
         for user in users:
             users_list.append(user.to_dict())
@@ -43,6 +54,7 @@ class UserAPI(MethodView):
         if user is None:
             abort(404)
 
+        check_object(user)
         return user.to_dict()
 
     def post(self):
@@ -0,0 +1,89 @@
+#!/usr/bin/python3
+"""
+Compares the FileStorage codecs on save time, reload time and file size
+
+For each size, Places are created once, then saved and reloaded with
+each available codec (json, orjson, msgpack) in a fresh child process,
+so that no codec benefits from objects or caches left by another.
+
+usage: ./benchmarks/codec_benchmark.py [--sizes 10000 100000 1000000]
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from models.engine import file_storage  # noqa: E402
+from models.place import Place  # noqa: E402
+
+
+def storage_for(codec, path):
+    """returns an empty FileStorage using codec on the file at path"""
+    os.environ["HBNB_FILE_CODEC"] = codec
+    for attr in ["objects", "partitions", "relations", "dirty", "serialized"]:
+        getattr(file_storage.FileStorage, "_FileStorage__" + attr).clear()
+    storage = file_storage.FileStorage()
+    storage._FileStorage__file_path = path
+    return storage
+
+
+def measure_save(codec, size, path, results):
+    """creates size Places and puts the time taken to save them"""
+    storage = storage_for(codec, path)
+    for i in range(size):
+        storage.new(Place(name="Place {}".format(i), city_id="c", user_id="u",
+                          number_rooms=i % 7, latitude=37.77,
+                          longitude=-122.41, amenity_ids=["a", "b"]))
+    start = time.perf_counter()
+    storage.save()
+    results.put(time.perf_counter() - start)
+
+
+def measure_load(codec, size, path, results):
+    """puts the time taken to reload the Places saved at path"""
+    storage = storage_for(codec, path)
+    start = time.perf_counter()
+    storage.reload()
+    elapsed = time.perf_counter() - start
+    assert storage.count(Place) == size
+    results.put(elapsed)
+
+
+def in_child(ctx, target, *args):
+    """runs target in a fresh child process and returns what it puts"""
+    results = ctx.Queue()
+    proc = ctx.Process(target=target, args=args + (results,))
+    proc.start()
+    result = results.get()
+    proc.join()
+    return result
+
+
+def main():
+    """parses the arguments and prints one line per size and codec"""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[10000, 100000, 1000000])
+    args = parser.parse_args()
+    ctx = multiprocessing.get_context("fork")
+    tmp = tempfile.mkdtemp()
+    print("{:>8} {:>8} {:>9} {:>9} {:>12}".format(
+        "objects", "codec", "save (s)", "load (s)", "size (bytes)"))
+    for size in args.sizes:
+        for codec in file_storage.codecs:
+            path = os.path.join(tmp, "{}_{}".format(codec, size))
+            save_time = in_child(ctx, measure_save, codec, size, path)
+            load_time = in_child(ctx, measure_load, codec, size, path)
+            file_size = os.path.getsize(path)
+            os.remove(path)
+            print("{:>8} {:>8} {:>9.3f} {:>9.3f} {:>12}".format(
+                size, codec, save_time, load_time, file_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/python3
+"""
+Measures loading reviews into DBStorage one save() at a time and through
+bulk_new()
+
+Each way loads the same number of reviews of a single place, and the
+rows per second of both are printed. bulk_new() is run once per chunk
+size.
+
+The tables of the database are dropped first: point HBNB_DB_URL, or the
+HBNB_MYSQL_* variables, to a scratch database.
+
+usage: HBNB_DB_URL=sqlite:///bench.db ./benchmarks/db_bulk_load.py
+       [--rows 10000] [--chunk-sizes 100 1000 10000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ["HBNB_TYPE_STORAGE"] = "db"
+os.environ["HBNB_ENV"] = "test"
+
+import models  # noqa: E402
+from models.city import City  # noqa: E402
+from models.place import Place  # noqa: E402
+from models.review import Review  # noqa: E402
+from models.state import State  # noqa: E402
+from models.user import User  # noqa: E402
+
+
+def reviews(place, user, rows):
+    """returns rows new reviews of place by user"""
+    return [Review(place_id=place.id, user_id=user.id, text="review")
+            for i in range(rows)]
+
+
+def main():
+    """parses the arguments and prints one line per way of loading"""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--chunk-sizes", type=int, nargs="+",
+                        default=[100, 1000, 10000])
+    args = parser.parse_args()
+    storage = models.storage
+    state = State(name="California")
+    city = City(name="San Francisco", state_id=state.id)
+    user = User(email="bench@hbnb.io", password="pwd")
+    place = Place(name="p", city_id=city.id, user_id=user.id)
+    for obj in [state, city, user, place]:
+        storage.new(obj)
+    storage.save()
+    print("{:>12} {:>8} {:>12}".format("load", "rows", "rows/s"))
+    start = time.perf_counter()
+    for review in reviews(place, user, args.rows):
+        review.save()
+    seconds = time.perf_counter() - start
+    print("{:>12} {:>8} {:>12.0f}".format("save()", args.rows,
+                                          args.rows / seconds))
+    storage.close()
+    for chunk_size in args.chunk_sizes:
+        stats = storage.bulk_new(reviews(place, user, args.rows), chunk_size)
+        print("{:>12} {:>8} {:>12.0f}".format(
+            "bulk/" + str(chunk_size), stats["rows"],
+            stats["rows_per_second"]))
+        storage.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/python3
+"""
+Measures DBStorage.get() and DBStorage.count() as the users table grows
+
+Users are added up to each size, then the time of get(User, id) on random
+ids, of count(User) and of count() is printed per call, each followed by
+close() as at the end of an API request. The same lookup done by scanning
+all(User), as get() used to, is printed for comparison.
+
+The tables of the database are dropped first: point HBNB_DB_URL, or the
+HBNB_MYSQL_* variables, to a scratch database.
+
+usage: HBNB_DB_URL=sqlite:///bench.db ./benchmarks/db_storage_lookups.py
+       [--sizes 1000 10000 100000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ["HBNB_TYPE_STORAGE"] = "db"
+os.environ["HBNB_ENV"] = "test"
+
+import models  # noqa: E402
+from models.user import User  # noqa: E402
+
+
+def per_call(func, calls):
+    """returns the mean time of calls calls to func, in microseconds"""
+    start = time.perf_counter()
+    for i in range(calls):
+        func()
+        models.storage.close()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main():
+    """parses the arguments and prints one line per size"""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[1000, 10000, 100000])
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+    storage = models.storage
+    ids = []
+    print("{:>8} {:>10} {:>12} {:>10} {:>12}".format(
+        "users", "get (us)", "count (us)", "all (us)", "scan (us)"))
+    for size in sorted(args.sizes):
+        with storage.batch():
+            while len(ids) < size:
+                user = User(email="{}@hbnb.io".format(len(ids)),
+                            password="pwd")
+                storage.new(user)
+                ids.append(user.id)
+        storage.close()
+        get_time = per_call(lambda: storage.get(User, random.choice(ids)),
+                            args.calls)
+        count_time = per_call(lambda: storage.count(User), args.calls)
+        total_time = per_call(storage.count, args.calls)
+        scan_time = per_call(lambda: storage.all(User).get(
+            "User." + random.choice(ids)), max(1, args.calls // 100))
+        print("{:>8} {:>10.0f} {:>12.0f} {:>10.0f} {:>12.0f}".format(
+            size, get_time, count_time, total_time, scan_time))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/python3
+"""
+Measures FileStorage throughput with several processes sharing one file
+
+Each worker process runs the work of an API request in a loop: close()
+to pick up other workers' writes, then either a lookup or, for one
+request in --write-every, the creation and save of a State. The total
+number of requests per second is printed for each worker count, and the
+final count of States is checked so no update was lost.
+
+usage: ./benchmarks/file_storage_workers.py [--objects N] [--seconds S]
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ["HBNB_FILE_SHARED"] = "1"
+os.environ.setdefault("HBNB_FILE_JOURNAL", "1")
+
+from models.engine.file_storage import FileStorage  # noqa: E402
+from models.state import State  # noqa: E402
+
+
+def worker(path, seconds, write_every, ids, results):
+    """runs requests against the file at path for the given seconds"""
+    storage = FileStorage()
+    storage._FileStorage__file_path = path
+    storage.reload()
+    requests = writes = 0
+    end = time.time() + seconds
+    while time.time() < end:
+        storage.close()
+        if requests % write_every == 0:
+            storage.new(State(name="bench"))
+            storage.save()
+            writes += 1
+        else:
+            storage.get(State, random.choice(ids))
+        requests += 1
+    results.put((requests, writes))
+
+
+def seed(path, objects, ids):
+    """writes objects States to the file at path and returns their ids"""
+    storage = FileStorage()
+    storage._FileStorage__file_path = path
+    states = [State(name="seed") for i in range(objects)]
+    with storage.batch():
+        for state in states:
+            storage.new(state)
+            storage.save()
+    ids.put([state.id for state in states])
+
+
+def count(path, results):
+    """counts the States saved in the file at path"""
+    storage = FileStorage()
+    storage._FileStorage__file_path = path
+    storage.reload()
+    results.put(storage.count(State))
+
+
+def in_child(ctx, target, *args):
+    """runs target in a fresh child and returns what it puts in its queue
+
+    Nothing is loaded in the parent, so each run starts from the file.
+    """
+    queue = ctx.Queue()
+    proc = ctx.Process(target=target, args=args + (queue,))
+    proc.start()
+    item = queue.get()
+    proc.join()
+    return item
+
+
+def run(ctx, path, workers, seconds, write_every, ids):
+    """runs the workers and returns (requests per second, writes)"""
+    results = ctx.Queue()
+    procs = [ctx.Process(target=worker,
+                         args=(path, seconds, write_every, ids, results))
+             for i in range(workers)]
+    for proc in procs:
+        proc.start()
+    counts = [results.get() for proc in procs]
+    for proc in procs:
+        proc.join()
+    return (sum(c[0] for c in counts) / seconds, sum(c[1] for c in counts))
+
+
+def main():
+    """parses the arguments and prints one line per worker count"""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--objects", type=int, default=10000)
+    parser.add_argument("--seconds", type=float, default=3)
+    parser.add_argument("--write-every", type=int, default=20)
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=[1, 2, 4, 8])
+    args = parser.parse_args()
+    ctx = multiprocessing.get_context("fork")
+    tmp = tempfile.mkdtemp()
+    print("{} CPUs, {} objects".format(os.cpu_count(), args.objects))
+    for workers in args.workers:
+        path = os.path.join(tmp, "bench_{}.json".format(workers))
+        ids = in_child(ctx, seed, path, args.objects)
+        rate, writes = run(ctx, path, workers, args.seconds,
+                           args.write_every, ids)
+        lost = args.objects + writes - in_child(ctx, count, path)
+        print("{:2d} workers: {:10.0f} requests/s, {} writes, {} lost"
+              .format(workers, rate, writes, lost))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,9 @@
 #!/usr/bin/python3
 """
 initialize the models package
+
+The storage is reloaded on import unless HBNB_STORAGE_RELOAD is 0, which
+the migrations command needs since reloading DBStorage creates the tables.
 """
 
 from os import getenv
@@ -11,7 +14,11 @@ storage_t = getenv("HBNB_TYPE_STORAGE")
 if storage_t == "db":
     from models.engine.db_storage import DBStorage
     storage = DBStorage()
+elif storage_t == "sqlite":
+    from models.engine.sqlite_storage import SQLiteStorage
+    storage = SQLiteStorage()
 else:
     from models.engine.file_storage import FileStorage
     storage = FileStorage()
-storage.reload()
+if getenv("HBNB_STORAGE_RELOAD") != "0":
+    storage.reload()
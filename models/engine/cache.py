@@ -0,0 +1,68 @@
+#!/usr/bin/python3
+"""
+Contains the LRUCache class
+"""
+
+from collections import OrderedDict
+import threading
+import time
+
+
+class LRUCache:
+    """thread-safe mapping keeping at most maxsize entries for ttl seconds
+
+    When full, putting a new entry evicts the least recently used one, and
+    an entry older than ttl is dropped when it is next looked up. Hits,
+    misses, evictions and expirations are counted for stats().
+    """
+
+    def __init__(self, maxsize=1024, ttl=60):
+        """Instantiate a LRUCache object"""
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.__entries = OrderedDict()
+        self.__lock = threading.Lock()
+        self.__counters = {"hits": 0, "misses": 0, "evictions": 0,
+                           "expirations": 0}
+
+    def get(self, key, default=None):
+        """returns the value stored under key, or default"""
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                del self.__entries[key]
+                self.__counters["expirations"] += 1
+                entry = None
+            if entry is None:
+                self.__counters["misses"] += 1
+                return default
+            self.__entries.move_to_end(key)
+            self.__counters["hits"] += 1
+            return entry[1]
+
+    def put(self, key, value):
+        """stores value under key, evicting the oldest entry if full"""
+        with self.__lock:
+            self.__entries[key] = (time.monotonic() + self.ttl, value)
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.maxsize:
+                self.__entries.popitem(last=False)
+                self.__counters["evictions"] += 1
+
+    def pop(self, key):
+        """removes the entry stored under key, if any"""
+        with self.__lock:
+            self.__entries.pop(key, None)
+
+    def clear(self):
+        """removes every entry"""
+        with self.__lock:
+            self.__entries.clear()
+
+    def stats(self):
+        """returns the size, settings and counters of the cache"""
+        with self.__lock:
+            stats = {"size": len(self.__entries), "maxsize": self.maxsize,
+                     "ttl": self.ttl}
+            stats.update(self.__counters)
+        return stats
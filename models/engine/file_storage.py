@@ -3,81 +3,622 @@
 Contains the FileStorage class
 """
 
+import bisect
+from contextlib import contextmanager
+from datetime import datetime, timezone
+import heapq
 import json
 from models.amenity import Amenity
 from models.base_model import BaseModel
 from models.city import City
 from models.place import Place
+from models.engine.rwlock import RWLock
 from models.review import Review
 from models.state import State
 from models.user import User
+import os
+from os import getenv
+import threading
+import time
+import uuid
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 classes = {"Amenity": Amenity, "BaseModel": BaseModel, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
+# attributes holding the id of a parent object, by class name
+relations = {"City": ("state_id",), "Place": ("city_id", "user_id"),
+             "Review": ("place_id", "user_id")}
+
+
+class JSONCodec:
+    """encodes records with the json module, datetimes in ISO 8601"""
+    binary = False
+
+    @staticmethod
+    def isoformat(obj):
+        """returns the ISO 8601 string of a datetime"""
+        if isinstance(obj, datetime):
+            return obj.isoformat()
+        raise TypeError(repr(obj) + " is not JSON serializable")
+
+    def dumps(self, obj):
+        """returns obj encoded as bytes"""
+        return json.dumps(obj, default=self.isoformat).encode()
+
+    def loads(self, data):
+        """returns the object encoded in data"""
+        return json.loads(data)
+
+
+class OrjsonCodec:
+    """encodes records with orjson, which writes datetimes itself"""
+    binary = False
+
+    def dumps(self, obj):
+        """returns obj encoded as bytes"""
+        return orjson.dumps(obj)
+
+    def loads(self, data):
+        """returns the object encoded in data"""
+        return orjson.loads(data)
+
+
+class MsgpackCodec:
+    """encodes records with msgpack, datetimes as msgpack timestamps"""
+    binary = True
+
+    @staticmethod
+    def timestamp(obj):
+        """returns the msgpack Timestamp of a naive UTC datetime"""
+        if isinstance(obj, datetime):
+            return msgpack.Timestamp.from_datetime(
+                obj.replace(tzinfo=timezone.utc))
+        raise TypeError(repr(obj) + " is not msgpack serializable")
+
+    @staticmethod
+    def naive(record):
+        """turns the Timestamp values of a record into naive datetimes"""
+        for key, value in record.items():
+            if isinstance(value, msgpack.Timestamp):
+                record[key] = value.to_datetime().replace(tzinfo=None)
+        return record
+
+    def dumps(self, obj):
+        """returns obj encoded as bytes"""
+        return msgpack.packb(obj, default=self.timestamp)
+
+    def loads(self, data):
+        """returns the object encoded in data"""
+        return msgpack.unpackb(data, object_hook=self.naive,
+                               strict_map_key=False)
+
+
+codecs = {"json": JSONCodec}
+if orjson is not None:
+    codecs["orjson"] = OrjsonCodec
+if msgpack is not None:
+    codecs["msgpack"] = MsgpackCodec
+
+
+class LazyDict(dict):
+    """dictionary holding records that become objects when looked up
+
+    A value that is still a plain dictionary is passed to hydrate, which
+    builds the object, stores it in place of the record and returns it.
+    Lengths and membership tests never build anything. Every way of
+    reading values, copies and dict(), {**...} or update() from it
+    included, returns objects.
+    """
+
+    def __init__(self, hydrate):
+        """Instantiate a LazyDict object"""
+        super().__init__()
+        self.hydrate = hydrate
+
+    def __getitem__(self, key):
+        """returns the object stored under key, building it if needed"""
+        value = super().__getitem__(key)
+        if type(value) is dict:
+            value = self.hydrate(key)
+        return value
+
+    def get(self, key, default=None):
+        """returns the object stored under key, or default"""
+        value = super().get(key, default)
+        if type(value) is dict:
+            value = self.hydrate(key)
+        return value
+
+    def values(self):
+        """returns the list of all objects, building them if needed"""
+        return [value for key, value in self.items()]
+
+    def items(self):
+        """returns the list of (key, object) pairs"""
+        pairs = []
+        for key in list(self.keys()):
+            value = self.get(key)
+            if value is not None:
+                pairs.append((key, value))
+        return pairs
+
+    def __iter__(self):
+        """iterates over the keys
+
+        Overriding it makes dict(), {**...} and update() read the values
+        through __getitem__ rather than straight from the dictionary.
+        """
+        return super().__iter__()
+
+    def copy(self):
+        """returns a plain dictionary of all objects"""
+        return dict(self.items())
+
+    def pop(self, key, *default):
+        """removes the object stored under key and returns it, or default"""
+        if key in self:
+            self[key]
+        return super().pop(key, *default)
+
+    def popitem(self):
+        """removes the last (key, object) pair and returns it"""
+        if not len(self):
+            raise KeyError("popitem(): dictionary is empty")
+        key = next(reversed(self.keys()))
+        return key, self.pop(key)
+
+    def setdefault(self, key, default=None):
+        """returns the object stored under key, storing default if none"""
+        if key in self:
+            return self[key]
+        return super().setdefault(key, default)
+
+
+class SortedKeys:
+    """keys of a partition, or of a group of a relation index, in order
+
+    Keys added are kept in a second, small sorted list that after() walks
+    along with the main one, and only folded into it once it grows past
+    an eighth of it, so that a page costs O(log N + limit + added) even
+    while other threads write. Keys removed from the partition or group
+    are skipped, and dropped once they outnumber the others.
+    """
+
+    def __init__(self, keys):
+        """Instantiate a SortedKeys object holding keys"""
+        self.order = sorted(keys)
+        self.added = []
+
+    def add(self, key):
+        """adds key, which just joined the partition or group"""
+        bisect.insort(self.added, key)
+
+    def after(self, start, limit, members):
+        """returns up to limit keys of members coming after start, in order
+        """
+        if len(self.added) > 64 + len(self.order) // 8:
+            self.order = list(heapq.merge(self.order, self.added))
+            self.added = []
+        if len(self.order) > 2 * len(members) + 16:
+            order = self.order
+            self.order = [key for i, key in enumerate(order)
+                          if key in members and
+                          (i == 0 or key != order[i - 1])]
+        keys = []
+        last = None
+        for key in heapq.merge(self.__tail(self.order, start),
+                               self.__tail(self.added, start)):
+            if len(keys) == limit:
+                break
+            if key != last and key in members:
+                keys.append(key)
+            last = key
+        return keys
+
+    @staticmethod
+    def __tail(keys, start):
+        """yields the keys of the sorted list keys coming after start"""
+        i = 0 if start is None else bisect.bisect_right(keys, start)
+        while i < len(keys):
+            yield keys[i]
+            i += 1
 
 
 class FileStorage:
-    """serializes instances to a JSON file & deserializes back to instances"""
+    """serializes instances to a JSON file & deserializes back to instances
+
+    When HBNB_FILE_JOURNAL is set, save() appends the changed and deleted
+    objects to <file>.log instead of rewriting the whole file, and the log
+    is folded back into the file once it holds more than
+    HBNB_JOURNAL_RATIO records per stored object or HBNB_JOURNAL_MAX_BYTES
+    bytes.
+
+    HBNB_FILE_CODEC picks how the file is encoded: "json", "orjson" (the
+    default when it is installed) or "msgpack". A file written with
+    another codec is still read, and rewritten with this one on the next
+    full save; reload() raises ValueError when no codec can read it. The
+    journal is always written as lines of JSON, with orjson when it is
+    installed.
+
+    When HBNB_FILE_LAZY is set, reload() keeps the records it reads and
+    only builds an object when it is looked up through get(), all() or
+    related(); count() and membership tests build nothing.
+
+    When HBNB_FILE_SHARED is set, several processes can use the same file:
+    writes hold an exclusive lock on <file>.lock and bump the generation
+    number kept in it, after first reading what other processes wrote
+    since the last generation seen. An object changed here and saved by
+    another process meanwhile keeps the attributes changed here and takes
+    the others from the file; it is dropped if the other process deleted
+    it. refresh() and close() read that number and only reload when it
+    moved; in journaled mode they only read the new end of the journal.
+
+    The objects are shared by every thread: changes to them and to the
+    indexes hold the write side of __lock, while lookups that walk an
+    index hold its read side. Single dictionary lookups need no lock.
+    Callers iterating over all() while other threads write should take a
+    copy first, e.g. list(storage.all(cls).values()).
+    """
 
     # string - path to the JSON file
     __file_path = "file.json"
     # dictionary - empty but will store all objects by <class name>.id
     __objects = {}
+    # dictionary - the same objects partitioned by <class name>
+    __partitions = {}
+    # dictionary - keys of the children of each parent id, by
+    # (<class name>, <attribute>) and then by the attribute value
+    __relations = {}
+    # dictionary - SortedKeys of the partitions paged through, by
+    # (<class name>,), and of the groups, by (<class name>, <attribute>,
+    # <attribute value>)
+    __ordered = {}
+    # set - keys added, updated or deleted since the last save
+    __dirty = set()
+    # dictionary - names of the attributes changed since the last save, by
+    # key, or None when the whole object was added, replaced or deleted
+    __touched = {}
+    # dictionary - number of changes to the objects of each <class name>
+    # and time of the last one, as (generation, datetime)
+    __generations = {}
+    # string - tells the generations of this process from those of others
+    __epoch = uuid.uuid4().hex
+    # dictionary - record of the objects unchanged since it was taken
+    __serialized = {}
+    # thread-local - batch depth, deferred save and undo log of each thread
+    __local = threading.local()
+    # locks - guarding the structures above, serializing writes to the
+    # files, and letting a single compaction run at a time
+    __lock = RWLock()
+    __io_lock = threading.Lock()
+    __compacting = threading.Lock()
 
-    def all(self, cls=None):
-        """returns the dictionary __objects"""
+    @classmethod
+    def _after_fork(cls):
+        """gives a forked child fresh locks, as other threads are gone"""
+        cls.__lock = RWLock()
+        cls.__io_lock = threading.Lock()
+        cls.__compacting = threading.Lock()
+        cls.__epoch = uuid.uuid4().hex
+
+    def __init__(self):
+        """Instantiate a FileStorage object"""
+        self.journal = getenv('HBNB_FILE_JOURNAL') in ("1", "true")
+        self.journal_ratio = float(getenv('HBNB_JOURNAL_RATIO', 1.0))
+        self.journal_max_bytes = int(getenv('HBNB_JOURNAL_MAX_BYTES',
+                                            64 * 1024 * 1024))
+        self.shared = getenv('HBNB_FILE_SHARED') in ("1", "true")
+        self.lazy = getenv('HBNB_FILE_LAZY') in ("1", "true")
+        codec = getenv('HBNB_FILE_CODEC',
+                       "orjson" if "orjson" in codecs else "json")
+        if codec not in codecs:
+            raise ValueError("unknown or unavailable codec: " + codec)
+        self.codec = codecs[codec]()
+        if self.codec.binary:
+            self.line_codec = codecs.get("orjson", JSONCodec)()
+        else:
+            self.line_codec = self.codec
+        if self.lazy and type(self.__objects) is not LazyDict:
+            objects = LazyDict(self.__hydrate)
+            objects.update(self.__objects)
+            FileStorage.__objects = objects
+        self.__log_entries = 0
+        self.__log_size = 0
+        self.__stamp = None
+        self.__generation = None
+        self.__fds = {}
+
+    def all(self, cls=None, load=None):
+        """returns the dictionary __objects, or the partition of cls
+
+        load is accepted for compatibility with DBStorage: relationships
+        are already answered from in-memory indexes.
+        """
         if cls is not None:
-            new_dict = {}
-            for key, value in self.__objects.items():
-                if cls == value.__class__ or cls == value.__class__.__name__:
-                    new_dict[key] = value
-            return new_dict
+            if type(cls) != str:
+                cls = cls.__name__
+            return self.__partitions.get(cls, {})
         return self.__objects
 
+    def iter(self, cls=None, batch_size=None):
+        """yields the objects of cls, or all objects, one at a time
+
+        The keys are copied first, so other threads may write meanwhile;
+        the objects deleted since are skipped. batch_size is accepted for
+        compatibility with DBStorage.
+        """
+        objects = self.all(cls)
+        for key in list(objects.keys()):
+            obj = objects.get(key)
+            if obj is not None:
+                yield obj
+
+    def page(self, cls, limit, after=None, attr=None, value=None):
+        """returns up to limit objects of cls whose id comes after the id
+        after, ordered by id
+
+        When attr is given, only the objects whose attribute attr equals
+        value are considered. The keys of the partition, or of the group
+        of the index of related() holding those objects, are kept sorted
+        from the first page on, so a page only reads its own keys. Other
+        attributes are compared on every object of cls.
+        """
+        if type(cls) != str:
+            cls = cls.__name__
+        objects = self.all(cls)
+        start = None if after is None else cls + "." + after
+        if attr is None or (cls, attr) in self.__relations:
+            if attr is None:
+                name = (cls,)
+            else:
+                name = (cls, attr, value)
+            with self.__lock.write():
+                if attr is None:
+                    members = objects
+                else:
+                    members = self.__relations[(cls, attr)].get(value, ())
+                ordered = self.__ordered.get(name)
+                if ordered is None and members:
+                    ordered = SortedKeys(members)
+                    self.__ordered[name] = ordered
+                keys = ordered.after(start, limit, members) if members else []
+        else:
+            keys = heapq.nsmallest(
+                limit, (key for key, obj in objects.items()
+                        if (start is None or key > start) and
+                        getattr(obj, attr, None) == value))
+        objs = []
+        for key in keys:
+            obj = objects.get(key)
+            if obj is not None:
+                objs.append(obj)
+        return objs
+
+    def generation(self, cls):
+        """returns a tag that changes whenever an object of cls is added,
+        changed or deleted, and the time of the last such change, or None
+
+        Loading objects from the file counts as changing them.
+        """
+        if type(cls) != str:
+            cls = cls.__name__
+        generation, modified = self.__generations.get(cls, (0, None))
+        return "{}-{}".format(self.__epoch, generation), modified
+
+    def generations(self, names):
+        """returns the generation of each class in names, as generation()
+        does
+        """
+        return {name if type(name) == str else name.__name__:
+                self.generation(name) for name in names}
+
     def new(self, obj):
         """sets in __objects the obj with key <obj class name>.id"""
         if obj is not None:
             key = obj.__class__.__name__ + "." + obj.id
-            self.__objects[key] = obj
+            with self.__lock.write():
+                self.__remember(key)
+                self.__touch(key, obj)
+                self.__dirty.add(self.__add(obj, key))
+
+    def bulk_new(self, objects, chunk_size=None):
+        """adds objects and saves them with a single write
+
+        chunk_size is accepted for compatibility with DBStorage. Returns
+        the number of objects, the seconds taken and the objects per
+        second.
+        """
+        start = time.perf_counter()
+        rows = 0
+        with self.__lock.write():
+            for obj in objects:
+                key = obj.__class__.__name__ + "." + obj.id
+                self.__remember(key)
+                self.__touch(key, obj)
+                self.__dirty.add(self.__add(obj, key))
+                rows += 1
+        self.save()
+        seconds = time.perf_counter() - start
+        return {"rows": rows, "seconds": seconds,
+                "rows_per_second": rows / seconds if seconds else 0.0}
 
     def save(self):
         """serializes __objects to the JSON file (path: __file_path)"""
-        json_objects = {}
-        for key in self.__objects:
-            json_objects[key] = self.__objects[key].to_dict()
-        with open(self.__file_path, 'w') as f:
-            json.dump(json_objects, f)
+        if getattr(self.__local, "depth", 0):
+            self.__local.pending = True
+            return
+        with self.__io_lock, self.__file_lock(".lock", "LOCK_EX"):
+            self.__catch_up()
+            if self.journal:
+                self.__append()
+                self.__written()
+                if self.__log_size > self.journal_max_bytes or \
+                   self.__log_entries > \
+                   self.journal_ratio * len(self.__objects):
+                    threading.Thread(target=self.compact,
+                                     daemon=True).start()
+                return
+            with self.__lock.write():
+                self.__dirty.clear()
+                self.__touched.clear()
+                json_objects = self.__snapshot()
+            self.__write(json_objects)
+            for path in [self.__log_path(), self.__log_path(".old")]:
+                if os.path.exists(path):
+                    os.remove(path)
+            self.__log_entries = 0
+            self.__log_size = 0
+            self.__written()
 
-    def reload(self):
-        """deserializes the JSON file to __objects"""
+    @contextmanager
+    def batch(self):
+        """defers save() until the outermost batch block exits
+
+        The changes are written once, when the block exits without an
+        exception; otherwise the objects added, changed or deleted inside
+        the block are put back as they were when it was entered. The
+        objects are shared, so other threads see the changes, and may
+        save them, before the block exits.
+        """
+        local = self.__local
+        local.depth = getattr(local, "depth", 0) + 1
+        if local.depth == 1:
+            local.undo = {}
         try:
-            with open(self.__file_path, 'r') as f:
-                jo = json.load(f)
-            for key in jo:
-                self.__objects[key] = classes[jo[key]["__class__"]](**jo[key])
+            yield self
         except:
+            local.depth -= 1
+            if local.depth == 0:
+                local.pending = False
+                self.__rollback(local.undo)
+                local.undo = None
+            raise
+        local.depth -= 1
+        if local.depth == 0:
+            local.undo = None
+            if getattr(local, "pending", False):
+                local.pending = False
+                self.save()
+
+    def compact(self):
+        """folds the journal back into the JSON file
+
+        The current log is sealed first, so saves made while the file is
+        being written go to a fresh log and are replayed after it. Only
+        one thread, and one process in shared mode, compacts at a time.
+        """
+        if not self.__compacting.acquire(blocking=False):
+            return
+        try:
+            with self.__file_lock(".compact", "LOCK_EX", blocking=False):
+                sealed = self.__log_path(".old")
+                with self.__io_lock, self.__file_lock(".lock", "LOCK_EX"):
+                    self.__catch_up()
+                    if os.path.exists(self.__log_path()):
+                        self.__seal(sealed)
+                    self.__log_entries = 0
+                    self.__log_size = 0
+                    with self.__lock.write():
+                        json_objects = self.__snapshot()
+                    self.__written()
+                self.__write(json_objects)
+                with self.__io_lock, self.__file_lock(".lock", "LOCK_EX"):
+                    if os.path.exists(sealed):
+                        os.remove(sealed)
+                    self.__catch_up()
+                    self.__written()
+        except BlockingIOError:
             pass
+        finally:
+            self.__compacting.release()
+
+    def __seal(self, sealed):
+        """moves the journal to sealed, after what a compaction that did not
+        finish left there"""
+        if not os.path.exists(sealed):
+            os.replace(self.__log_path(), sealed)
+            return
+        with open(self.__log_path(), 'rb') as log, open(sealed, 'a+b') as f:
+            f.truncate(self.__line_end(f))
+            f.write(log.read())
+            f.flush()
+            os.fsync(f.fileno())
+        os.remove(self.__log_path())
+
+    def reload(self):
+        """deserializes the JSON file to __objects
+
+        Objects changed in memory and not saved yet are left as they are.
+        """
+        with self.__io_lock, self.__file_lock(".lock", "LOCK_SH"):
+            self.__load()
 
     def delete(self, obj=None):
         """delete obj from __objects if it’s inside"""
         if obj is not None:
             key = obj.__class__.__name__ + '.' + obj.id
-            if key in self.__objects:
-                del self.__objects[key]
+            with self.__lock.write():
+                if key in self.__objects:
+                    self.__remember(key)
+                    self.__touched[key] = None
+                    self.__remove(key)
+                    self.__dirty.add(key)
+
+    def related(self, cls, attr, value):
+        """returns the objects of cls whose attribute attr equals value"""
+        if type(cls) != str:
+            cls = cls.__name__
+        partition = self.all(cls)
+        with self.__lock.read():
+            keys = list(self.__relations.get((cls, attr), {}).get(value, ()))
+        objs = {}
+        for key in keys:
+            obj = partition.get(key)
+            if obj is not None:
+                objs[key] = obj
+        return objs
 
-    def get(self, cls, id):
+    def track(self, obj, name, old):
+        """records that an attribute of obj changed, keeping indexes in line"""
+        cls_name = obj.__class__.__name__
+        key = cls_name + "." + str(obj.__dict__.get("id"))
+        if dict.get(self.__objects, key) is not obj:
+            return
+        with self.__lock.write():
+            self.__remember(key, name, old)
+            self.__touch(key, obj, name)
+            self.__dirty.add(key)
+            self.__serialized.pop(key, None)
+            self.__bump(cls_name)
+            if name in relations.get(cls_name, ()):
+                index = self.__relations.setdefault((cls_name, name), {})
+                index.get(old, set()).discard(key)
+                self.__link(cls_name, name, getattr(obj, name, None), key)
+
+    def get(self, cls, id, load=None):
         """
         Method that retrieves on object
         form class and id
         :param cls: class name
         :param id: string representation of the id
+        :param load: ignored, as in all()
         :return: the object based on the class name and its ID,
          or None if not found
         """
         if cls and id and type(cls) != str:
             key = cls.__name__ + "." + id
-            objs = self.all(cls)
-            return objs.get(key)
+            return self.all(cls).get(key)
 
         return None
 
@@ -91,6 +632,456 @@ class FileStorage:
         """
         return len(self.all(cls))
 
+    def counts(self):
+        """returns the number of objects of every class, by name"""
+        return {name: len(self.all(name)) for name in classes}
+
+    def refresh(self):
+        """reads what was written to the JSON file or its journal since
+        they were last read, if anything"""
+        with self.__io_lock, self.__file_lock(".lock", "LOCK_SH"):
+            if self.__changed():
+                self.__load(tail=True)
+
     def close(self):
-        """call reload() method for deserializing the JSON file to objects"""
-        self.reload()
+        """call reload() if the JSON file or its journal changed on disk"""
+        self.refresh()
+
+    def __add(self, obj, key=None):
+        """stores obj, or the record stored under key, returns its key"""
+        if key is None:
+            key = obj.__class__.__name__ + "." + obj.id
+        cls_name = key.split(".", 1)[0]
+        if key in self.__objects:
+            self.__unindex(dict.get(self.__objects, key), key)
+        dict.__setitem__(self.__objects, key, obj)
+        self.__serialized.pop(key, None)
+        partition = self.__partitions.get(cls_name)
+        if partition is None:
+            partition = LazyDict(self.__hydrate) if self.lazy else {}
+            self.__partitions[cls_name] = partition
+        if key not in partition and (cls_name,) in self.__ordered:
+            self.__ordered[(cls_name,)].add(key)
+        dict.__setitem__(partition, key, obj)
+        self.__index(obj, key)
+        self.__bump(cls_name)
+        return key
+
+    def __update(self, obj, key):
+        """stores obj, or the record of obj, under key, under the write lock
+
+        An object already stored there takes the attributes of obj instead
+        of being replaced, so that references to it stay current.
+        """
+        current = dict.get(self.__objects, key)
+        if current is None or type(current) is dict:
+            self.__add(obj, key)
+            return
+        if type(obj) is dict:
+            obj = classes[obj["__class__"]](**obj)
+        self.__unindex(current, key)
+        current.__dict__.clear()
+        current.__dict__.update(obj.__dict__)
+        self.__index(current, key)
+        self.__serialized.pop(key, None)
+        self.__bump(key.split(".", 1)[0])
+
+    def __remove(self, key):
+        """removes the object stored under key from __objects and indexes"""
+        obj = dict.pop(self.__objects, key)
+        self.__serialized.pop(key, None)
+        self.__unindex(obj, key)
+        dict.pop(self.__partitions.get(key.split(".", 1)[0], {}), key, None)
+        self.__bump(key.split(".", 1)[0])
+
+    def __remember(self, key, name=None, old=None):
+        """keeps what is stored under key before the first change made to
+        it inside the batch block of the thread, under the write lock
+
+        When the attribute name of the object already changed, old is its
+        previous value.
+        """
+        undo = getattr(self.__local, "undo", None)
+        if undo is None or key in undo:
+            return
+        obj = dict.get(self.__objects, key)
+        state = None
+        if obj is not None and type(obj) is not dict:
+            state = obj.__dict__.copy()
+            if name is not None:
+                state[name] = old
+        undo[key] = (obj, state)
+
+    def __rollback(self, undo):
+        """puts back the objects kept by __remember()
+
+        The keys stay dirty, as another thread may have saved the changes
+        undone meanwhile.
+        """
+        with self.__lock.write():
+            for key, (obj, state) in undo.items():
+                if key in self.__objects:
+                    self.__remove(key)
+                if obj is not None:
+                    if state is not None:
+                        obj.__dict__.clear()
+                        obj.__dict__.update(state)
+                    self.__add(obj, key)
+                self.__dirty.add(key)
+                self.__touched[key] = None
+
+    def __touch(self, key, obj, name=None):
+        """records that the attribute name of obj, stored under key, changed,
+        or that obj replaces what is stored under key, under the write lock
+        """
+        if name is None and dict.get(self.__objects, key) is not obj:
+            self.__touched[key] = None
+        elif self.__touched.get(key, ()) is not None:
+            self.__touched.setdefault(key, set())
+            if name is not None:
+                self.__touched[key].add(name)
+
+    def __merge(self, key, record, loaded):
+        """applies to the object changed here under key the record another
+        process saved since, under the write lock
+
+        The attributes changed here are kept and the others take the values
+        of loaded, the object of record. An object added, replaced or
+        deleted here is kept as it is; one deleted by the other process is
+        dropped.
+        """
+        obj = dict.get(self.__objects, key)
+        attrs = self.__touched.get(key)
+        if obj is None or attrs is None:
+            return
+        if record is None:
+            self.__remove(key)
+            self.__dirty.discard(key)
+            del self.__touched[key]
+            return
+        if type(loaded) is dict:
+            loaded = classes[record["__class__"]](**record)
+        self.__unindex(obj, key)
+        for name, value in loaded.__dict__.items():
+            if name not in attrs:
+                obj.__dict__[name] = value
+        self.__index(obj, key)
+        self.__serialized.pop(key, None)
+        self.__bump(key.split(".", 1)[0])
+
+    def __bump(self, cls_name):
+        """counts a change to the objects of cls_name, under the write lock
+        """
+        generation = self.__generations.get(cls_name, (0, None))[0]
+        self.__generations[cls_name] = (generation + 1, datetime.utcnow())
+
+    def __hydrate(self, key):
+        """builds the object of the record stored under key"""
+        with self.__lock.write():
+            obj = dict.get(self.__objects, key)
+            if type(obj) is dict:
+                record = obj
+                obj = classes[record["__class__"]](**record)
+                dict.__setitem__(self.__objects, key, obj)
+                dict.__setitem__(self.__partitions[key.split(".", 1)[0]],
+                                 key, obj)
+                self.__serialized[key] = record
+        return obj
+
+    def __load(self, tail=False):
+        """reads the JSON file and its journals into __objects
+
+        With tail, when only the journal grew since the last load, only
+        its new records are read. Otherwise everything is read, and the
+        objects missing from the files are dropped.
+        """
+        identity = self.__identity()
+        stamp = self.__stamp
+        tail = tail and stamp is not None and identity[0] == stamp[0] and \
+            identity[2] == stamp[2] and identity[1] is not None and \
+            stamp[1] is not None and identity[1][0] == stamp[1][0]
+        records = {}
+        if not tail:
+            try:
+                with open(self.__file_path, 'rb') as f:
+                    records.update(self.__decode(f.read()))
+            except FileNotFoundError:
+                pass
+            self.__log_entries = 0
+            records.update(self.__replay(self.__log_path(".old"), 0))
+            self.__log_size = 0
+        records.update(self.__replay(self.__log_path(), self.__log_size))
+        objs = []
+        for key, value in records.items():
+            if value is None or self.lazy:
+                objs.append((key, value, value))
+            else:
+                objs.append((key, value, classes[value["__class__"]](**value)))
+        with self.__lock.write():
+            for key, value, obj in objs:
+                if key in self.__dirty:
+                    self.__merge(key, value, obj)
+                    continue
+                if obj is not None:
+                    self.__update(obj, key)
+                    self.__serialized[key] = value
+                elif key in self.__objects:
+                    self.__remove(key)
+            if not tail:
+                for key in [key for key in self.__objects
+                            if key not in records]:
+                    if key in self.__dirty:
+                        self.__merge(key, None, None)
+                    else:
+                        self.__remove(key)
+        self.__stamp = identity
+        if self.shared:
+            self.__generation = self.__read_generation()
+
+    def __decode(self, data):
+        """returns the records of the JSON file read as data
+
+        data is decoded with the codec of the storage or, failing that,
+        with the first other codec that can; an empty file holds none.
+        Raises ValueError when no codec can decode data.
+        """
+        if not data:
+            return {}
+        others = [codec() for codec in codecs.values()
+                  if type(self.codec) is not codec]
+        for codec in [self.codec] + others:
+            try:
+                records = codec.loads(data)
+            except ValueError:
+                continue
+            if type(records) is dict:
+                return records
+        raise ValueError("{} cannot be decoded by any codec"
+                         .format(self.__file_path))
+
+    def __index(self, obj, key):
+        """adds key to the relation indexes of obj"""
+        cls_name = key.split(".", 1)[0]
+        for attr in relations.get(cls_name, ()):
+            self.__link(cls_name, attr, self.__attr(obj, attr), key)
+
+    def __link(self, cls_name, attr, value, key):
+        """adds key to the group of value in the index of attr"""
+        group = self.__relations.setdefault((cls_name, attr), {}).setdefault(
+            value, set())
+        if key not in group:
+            group.add(key)
+            ordered = self.__ordered.get((cls_name, attr, value))
+            if ordered is not None:
+                ordered.add(key)
+
+    def __unindex(self, obj, key):
+        """removes key from the relation indexes of obj"""
+        cls_name = key.split(".", 1)[0]
+        for attr in relations.get(cls_name, ()):
+            index = self.__relations.get((cls_name, attr), {})
+            index.get(self.__attr(obj, attr), set()).discard(key)
+
+    def __attr(self, obj, attr):
+        """returns the attribute attr of an object or of a record"""
+        if type(obj) is dict:
+            if attr in obj:
+                return obj[attr]
+            obj = classes[obj["__class__"]]
+        return getattr(obj, attr, None)
+
+    def __identity(self):
+        """returns what identifies the files on disk in their current state
+
+        The JSON file is always replaced rather than rewritten in place
+        and the journals only grow, so the inode, size or modification
+        time of one of them changes whenever anything is written.
+        """
+        identity = []
+        for path in [self.__file_path, self.__log_path(),
+                     self.__log_path(".old")]:
+            try:
+                st = os.stat(path)
+                identity.append((st.st_ino, st.st_size, st.st_mtime_ns))
+            except OSError:
+                identity.append(None)
+        return identity
+
+    def __log_path(self, suffix=""):
+        """returns the path of the journal, or of its sealed copy"""
+        return self.__file_path + ".log" + suffix
+
+    def __serialize(self, key, obj):
+        """returns the record of obj, reusing the last one if obj is unchanged
+
+        Unlike to_dict(), the datetimes are left for the codec to encode.
+        """
+        obj_dict = self.__serialized.get(key)
+        if obj_dict is None and type(obj) is dict:
+            obj_dict = obj
+        elif obj_dict is None:
+            obj_dict = obj.__dict__.copy()
+            obj_dict.pop("_sa_instance_state", None)
+            obj_dict["__class__"] = obj.__class__.__name__
+            self.__serialized[key] = obj_dict
+        return obj_dict
+
+    def __snapshot(self):
+        """returns the dictionaries of all objects, by key"""
+        json_objects = {}
+        for key, obj in dict.items(self.__objects):
+            json_objects[key] = self.__serialize(key, obj)
+        return json_objects
+
+    def __write(self, json_objects):
+        """writes json_objects as the JSON file, replacing it at once
+
+        The new file is flushed to disk before it replaces the old one,
+        and the rename before returning, so the journals it folds in can
+        be removed afterwards.
+        """
+        tmp_path = "{}.{}.{}.tmp".format(self.__file_path, os.getpid(),
+                                         threading.get_ident())
+        with open(tmp_path, 'wb') as f:
+            f.write(self.codec.dumps(json_objects))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.__file_path)
+        self.__sync_dir()
+
+    def __sync_dir(self):
+        """flushes the entries of the directory of the file to disk"""
+        if os.name != "posix":
+            return
+        fd = os.open(os.path.dirname(os.path.abspath(self.__file_path)),
+                     os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def __append(self):
+        """appends the objects changed since the last save to the journal
+
+        Each line maps one key to its object dictionary, or to null when
+        the object was deleted.
+        """
+        with self.__lock.write():
+            if not self.__dirty:
+                return
+            records = []
+            for key in self.__dirty:
+                obj = dict.get(self.__objects, key)
+                if obj is not None:
+                    records.append({key: self.__serialize(key, obj)})
+                else:
+                    records.append({key: None})
+            self.__dirty.clear()
+            self.__touched.clear()
+        lines = [self.line_codec.dumps(record) + b"\n"
+                 for record in records]
+        with open(self.__log_path(), 'a+b') as f:
+            end = self.__line_end(f)
+            if end != f.tell():
+                f.truncate(end)
+            f.write(b"".join(lines))
+            self.__log_size = f.tell()
+        self.__log_entries += len(lines)
+
+    def __line_end(self, f):
+        """returns the size of the journal f up to its last complete line
+
+        A line left unfinished by a crash is dropped before appending, so
+        it cannot swallow the next record. The position of f is left at
+        its end.
+        """
+        end = f.seek(0, os.SEEK_END)
+        pos = end
+        while pos > 0:
+            size = min(4096, pos)
+            f.seek(pos - size)
+            chunk = f.read(size)
+            pos -= size
+            if b"\n" in chunk:
+                pos += chunk.rindex(b"\n") + 1
+                break
+        f.seek(0, os.SEEK_END)
+        return pos
+
+    def __replay(self, path, offset):
+        """returns the records of the journal at path, from byte offset on
+
+        The records are given as a dictionary of key: dictionary or None.
+        A last line not ended yet is left for the next call.
+        """
+        records = {}
+        try:
+            f = open(path, 'rb')
+        except OSError:
+            return records
+        with f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                offset += len(line)
+                try:
+                    records.update(self.line_codec.loads(line))
+                except ValueError:
+                    continue
+                self.__log_entries += 1
+        if path == self.__log_path():
+            self.__log_size = offset
+        return records
+
+    def __changed(self):
+        """tells whether the files changed since they were last read"""
+        if self.shared:
+            return self.__read_generation() != self.__generation
+        return self.__identity() != self.__stamp
+
+    def __written(self):
+        """records that this process just wrote the files"""
+        self.__stamp = self.__identity()
+        if self.shared:
+            self.__generation = self.__read_generation() + 1
+            os.pwrite(self.__fd(".lock"),
+                      "{:020d}\n".format(self.__generation).encode(), 0)
+
+    def __catch_up(self):
+        """reads what other processes wrote since the last generation seen"""
+        if self.shared and self.__changed():
+            self.__load(tail=True)
+
+    def __read_generation(self):
+        """returns the generation number kept in the lock file"""
+        data = os.pread(self.__fd(".lock"), 32, 0)
+        return int(data) if data.strip() else 0
+
+    def __fd(self, suffix):
+        """returns the descriptor of <file><suffix>, opened once a process"""
+        pid, fd = self.__fds.get(suffix, (None, None))
+        if pid != os.getpid():
+            fd = os.open(self.__file_path + suffix, os.O_RDWR | os.O_CREAT)
+            self.__fds[suffix] = (os.getpid(), fd)
+        return fd
+
+    @contextmanager
+    def __file_lock(self, suffix, mode, blocking=True):
+        """holds an advisory lock on <file><suffix> in shared mode"""
+        if not self.shared:
+            yield
+            return
+        fd = self.__fd(suffix)
+        flags = getattr(fcntl, mode)
+        if not blocking:
+            flags |= fcntl.LOCK_NB
+        fcntl.flock(fd, flags)
+        try:
+            yield
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=FileStorage._after_fork)
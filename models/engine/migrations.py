@@ -0,0 +1,101 @@
+#!/usr/bin/python3
+"""
+Brings an existing database up to the schema declared by the models
+
+Only additions are made: missing tables, columns and indexes are created,
+and nothing is ever dropped or altered, so the data already stored is
+kept. A column declared NOT NULL without a server default is added as
+nullable, since the rows already stored have no value for it.
+
+usage: HBNB_TYPE_STORAGE=db HBNB_STORAGE_RELOAD=0 \
+           python3 -m models.engine.migrations [--dry-run]
+
+The database is the one DBStorage connects to (HBNB_DB_URL or the
+HBNB_MYSQL_* variables). HBNB_STORAGE_RELOAD=0 keeps the import of models
+from reloading DBStorage, which would create the missing tables itself
+before anything is planned. Do not set HBNB_ENV=test, which drops every
+table when DBStorage starts.
+"""
+
+import argparse
+import models
+from os import getenv
+import sqlalchemy
+from sqlalchemy.schema import CreateColumn, CreateIndex, CreateTable
+import sys
+
+
+def plan(engine, metadata):
+    """returns the statements creating what metadata declares and the
+    database of engine lacks, as strings in the dialect of engine"""
+    inspector = sqlalchemy.inspect(engine)
+    dialect = engine.dialect
+    quote = dialect.identifier_preparer.quote
+    existing = set(inspector.get_table_names())
+    statements = []
+    for table in metadata.sorted_tables:
+        if table.name not in existing:
+            statements.append(str(CreateTable(table).compile(dialect=dialect)))
+            for index in table.indexes:
+                statements.append(
+                    str(CreateIndex(index).compile(dialect=dialect)))
+            continue
+        columns = {column["name"] for column in inspector.get_columns(
+            table.name)}
+        for column in table.columns:
+            if column.name in columns:
+                continue
+            if not column.nullable and column.server_default is None:
+                column = sqlalchemy.Column(column.name, column.type)
+                sqlalchemy.Table(table.name, sqlalchemy.MetaData(), column)
+            statements.append("ALTER TABLE {} ADD COLUMN {}".format(
+                quote(table.name),
+                CreateColumn(column).compile(dialect=dialect)))
+        indexed = [tuple(index["column_names"])
+                   for index in inspector.get_indexes(table.name)]
+        primary = inspector.get_pk_constraint(table.name)
+        indexed.append(tuple(primary.get("constrained_columns") or ()))
+        for index in table.indexes:
+            names = tuple(column.name for column in index.columns)
+            if any(columns[:len(names)] == names for columns in indexed):
+                continue
+            statements.append(str(CreateIndex(index).compile(dialect=dialect)))
+    return [statement.strip() for statement in statements]
+
+
+def migrate(engine, metadata, dry_run=False):
+    """runs the statements of plan(), unless dry_run, and returns them
+
+    MySQL commits each DDL statement as it runs, so a failure can leave the
+    statements before it applied; running again creates the rest.
+    """
+    statements = plan(engine, metadata)
+    if not dry_run and statements:
+        with engine.begin() as conn:
+            for statement in statements:
+                conn.exec_driver_sql(statement)
+    return statements
+
+
+def main():
+    """migrates the database of DBStorage, printing each statement"""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dry-run", action="store_true",
+                        help="print the statements without running them")
+    args = parser.parse_args()
+    if models.storage_t != "db":
+        sys.exit("HBNB_TYPE_STORAGE must be db")
+    if getenv("HBNB_STORAGE_RELOAD") != "0":
+        sys.exit("HBNB_STORAGE_RELOAD must be 0")
+    from models.base_model import Base
+    from models.engine.db_storage import database_url
+    engine = sqlalchemy.create_engine(database_url())
+    try:
+        for statement in migrate(engine, Base.metadata, args.dry_run):
+            print(statement + ";")
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
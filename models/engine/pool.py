@@ -0,0 +1,73 @@
+#!/usr/bin/python3
+"""
+Contains the InstrumentedQueuePool class
+"""
+
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.pool import QueuePool
+import threading
+import time
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool keeping statistics on how long checkouts take
+
+    The time of a checkout runs from the request of a connection until one
+    is handed over, so it covers waiting for another thread to return one
+    as well as opening a new one. Each time is counted in the first bucket
+    of the histogram whose upper bound, in milliseconds, it does not
+    exceed; checkouts given up after pool_timeout are counted apart.
+    """
+
+    # list - upper bounds of the histogram buckets, in milliseconds
+    buckets = [0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000, 5000]
+
+    def __init__(self, *args, **kwargs):
+        """Instantiate an InstrumentedQueuePool object"""
+        super().__init__(*args, **kwargs)
+        self.__lock = threading.Lock()
+        self.__checkouts = 0
+        self.__timeouts = 0
+        self.__wait = 0.0
+        self.__max_wait = 0.0
+        self.__histogram = [0] * (len(self.buckets) + 1)
+
+    def _do_get(self):
+        """checks a connection out of the pool, timing how long it takes"""
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except TimeoutError:
+            with self.__lock:
+                self.__timeouts += 1
+            raise
+        wait = (time.perf_counter() - start) * 1000
+        bucket = 0
+        while bucket < len(self.buckets) and wait > self.buckets[bucket]:
+            bucket += 1
+        with self.__lock:
+            self.__checkouts += 1
+            self.__wait += wait
+            self.__max_wait = max(self.__max_wait, wait)
+            self.__histogram[bucket] += 1
+        return conn
+
+    def stats(self):
+        """returns the state of the pool and its checkout statistics"""
+        with self.__lock:
+            checkouts = self.__checkouts
+            histogram = list(self.__histogram)
+            wait = {"total": self.__wait, "max": self.__max_wait,
+                    "mean": self.__wait / checkouts if checkouts else 0.0}
+            timeouts = self.__timeouts
+        bounds = [str(bound) for bound in self.buckets] + ["+Inf"]
+        histogram = [{"le": bound, "count": count}
+                     for bound, count in zip(bounds, histogram)]
+        return {"size": self.size(),
+                "checked_in": self.checkedin(),
+                "checked_out": self.checkedout(),
+                "overflow": self.overflow(),
+                "checkouts": checkouts,
+                "timeouts": timeouts,
+                "wait_ms": wait,
+                "histogram_ms": histogram}
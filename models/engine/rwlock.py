@@ -0,0 +1,69 @@
+#!/usr/bin/python3
+"""
+Contains the RWLock class
+"""
+
+from contextlib import contextmanager
+import threading
+
+
+class RWLock:
+    """readers–writer lock: many readers at once, or a single writer
+
+    Waiting writers go before new readers so they are not starved. The
+    writer may take the lock again, for reading or writing, while it
+    holds it, and a reader may take it again for reading. A reader can
+    not upgrade to writing.
+    """
+
+    def __init__(self):
+        """Instantiate a RWLock object"""
+        self.__cond = threading.Condition(threading.Lock())
+        self.__readers = 0
+        self.__writer = None
+        self.__writes = 0
+        self.__waiting = 0
+        self.__local = threading.local()
+
+    @contextmanager
+    def read(self):
+        """holds the lock for reading for the duration of the block"""
+        me = threading.get_ident()
+        held = getattr(self.__local, "reads", 0)
+        with self.__cond:
+            if not held and self.__writer != me:
+                while self.__writer is not None or self.__waiting:
+                    self.__cond.wait()
+            self.__readers += 1
+        self.__local.reads = held + 1
+        try:
+            yield
+        finally:
+            self.__local.reads = held
+            with self.__cond:
+                self.__readers -= 1
+                if not self.__readers:
+                    self.__cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        """holds the lock for writing for the duration of the block"""
+        me = threading.get_ident()
+        with self.__cond:
+            if self.__writer == me:
+                self.__writes += 1
+            else:
+                self.__waiting += 1
+                while self.__writer is not None or self.__readers:
+                    self.__cond.wait()
+                self.__waiting -= 1
+                self.__writer = me
+                self.__writes = 1
+        try:
+            yield
+        finally:
+            with self.__cond:
+                self.__writes -= 1
+                if not self.__writes:
+                    self.__writer = None
+                    self.__cond.notify_all()
@@ -0,0 +1,461 @@
+#!/usr/bin/python3
+"""
+Contains the SQLiteStorage class
+"""
+
+from contextlib import contextmanager
+from datetime import datetime
+from models.engine.file_storage import classes, codecs, relations, JSONCodec
+import itertools
+import sqlite3
+import threading
+import time
+import weakref
+
+
+class SQLiteStorage:
+    """stores objects in a SQLite file, one table per class
+
+    Each table maps the id of an object to its record, encoded as JSON, and
+    the attributes holding the id of a parent object are indexed, so that
+    get(), count() and related() are answered by the database instead of
+    by loading every object. save() only writes the objects added, changed
+    or deleted since the last save, in a single transaction.
+
+    The file runs in WAL mode, so readers never wait for a writer. Each
+    thread has its own connection, its own map of the objects it has
+    loaded, which returns the same instance for the same key for as long
+    as it is referenced, and its own pending changes; close() forgets
+    them, as DBStorage does with its session.
+    """
+
+    # string - path to the SQLite file
+    __file_path = "file.db"
+
+    def __init__(self):
+        """Instantiate a SQLiteStorage object"""
+        self.codec = codecs.get("orjson", JSONCodec)()
+        self.timeout = 30
+        self.__local = threading.local()
+
+    def all(self, cls=None, load=None):
+        """returns the dictionary of all objects, or of those of cls
+
+        load is accepted for compatibility with DBStorage: relationships
+        are answered by indexed queries on the local file.
+        """
+        objs = {}
+        for name in self.__names(cls):
+            rows = self.__connection().execute(
+                'SELECT id, data FROM "{}"'.format(name))
+            for id, data in rows:
+                key = name + "." + id
+                objs[key] = self.__object(key, data)
+        return self.__overlay(objs, cls)
+
+    def iter(self, cls=None, batch_size=1000):
+        """yields the objects of cls, or all objects, one at a time
+
+        Rows are fetched batch_size at a time, and only the objects still
+        referenced elsewhere stay loaded, so memory does not grow with the
+        table.
+        """
+        names = self.__names(cls)
+        pending = self.__pending()
+        for name in names:
+            cursor = self.__connection().execute(
+                'SELECT id, data FROM "{}"'.format(name))
+            rows = cursor.fetchmany(batch_size)
+            while rows:
+                for id, data in rows:
+                    key = name + "." + id
+                    if key not in pending:
+                        yield self.__object(key, data)
+                rows = cursor.fetchmany(batch_size)
+        for key, obj in list(pending.items()):
+            if obj is not None and key.split(".", 1)[0] in names:
+                yield obj
+
+    def page(self, cls, limit, after=None, attr=None, value=None):
+        """returns up to limit objects of cls whose id comes after the id
+        after, ordered by id
+
+        When attr is given, only the objects whose attribute attr equals
+        value are returned. The primary key serves the order, so only the
+        rows of the page are read, plus one per pending change of the
+        thread, which may hide a row.
+        """
+        names = self.__names(cls)
+        if not names:
+            return []
+        name = names[0]
+        if attr is not None and attr not in relations.get(name, ()):
+            objs = self.related(name, attr, value)
+            start = None if after is None else name + "." + after
+            keys = sorted(key for key in objs if start is None or key > start)
+            return [objs[key] for key in keys[:limit]]
+        pending = {key: obj for key, obj in self.__pending().items()
+                   if key.split(".", 1)[0] == name}
+        where = []
+        params = []
+        if after is not None:
+            where.append("id > ?")
+            params.append(after)
+        if attr is not None:
+            where.append("json_extract(data, '$.{}') = ?".format(attr))
+            params.append(value)
+        query = 'SELECT id, data FROM "{}"'.format(name)
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        query += " ORDER BY id LIMIT ?"
+        params.append(limit + len(pending))
+        objs = {}
+        for id, data in self.__connection().execute(query, params):
+            key = name + "." + id
+            objs[key] = self.__object(key, data)
+        for key, obj in pending.items():
+            if obj is None or \
+               (after is not None and obj.id <= after) or \
+               (attr is not None and getattr(obj, attr, None) != value):
+                objs.pop(key, None)
+            else:
+                objs[key] = obj
+        return [objs[key] for key in sorted(objs)[:limit]]
+
+    def generation(self, cls):
+        """returns a tag that changes whenever an object of cls is written
+        or deleted, and the time of the last such change, or None
+
+        The generations are kept in the file and bumped by the transaction
+        writing the change, so they follow the writes of every process.
+        Pending changes of the thread are not counted.
+        """
+        if type(cls) != str:
+            cls = cls.__name__
+        return self.generations([cls])[cls]
+
+    def generations(self, names):
+        """returns the generation of each class in names, as generation()
+        does, read with a single query
+        """
+        names = [name if type(name) == str else name.__name__
+                 for name in names]
+        known = sorted(set(name for name in names if name in classes))
+        found = {}
+        if known:
+            found = {row[0]: row[1:] for row in self.__connection().execute(
+                "SELECT name, generation, updated_at FROM generations "
+                "WHERE name IN ({})".format(", ".join("?" * len(known))),
+                known)}
+        result = {}
+        for name in names:
+            row = found.get(name)
+            if row is None:
+                result[name] = ("0", None)
+            else:
+                result[name] = ("{}-{}".format(*row),
+                                datetime.fromisoformat(row[1]))
+        return result
+
+    def new(self, obj):
+        """adds obj to the objects to write on the next save"""
+        if obj is not None:
+            key = obj.__class__.__name__ + "." + obj.id
+            self.__objects()[key] = obj
+            self.__pending()[key] = obj
+
+    def bulk_new(self, objects, chunk_size=1000):
+        """writes objects chunk_size rows at a time, one transaction each
+
+        The objects skip the pending changes of the thread; inside batch()
+        they are added to them instead, and written when the block exits.
+        Returns the number of rows, the seconds taken and the rows per
+        second.
+        """
+        start = time.perf_counter()
+        rows = 0
+        objects = iter(objects)
+        chunk = list(itertools.islice(objects, chunk_size))
+        while chunk:
+            if getattr(self.__local, "depth", 0):
+                for obj in chunk:
+                    self.new(obj)
+            else:
+                pending = self.__pending()
+                values = {}
+                for obj in chunk:
+                    name = obj.__class__.__name__
+                    pending.pop(name + "." + obj.id, None)
+                    values.setdefault(name, []).append(
+                        (obj.id, self.__dumps(obj)))
+                self.__write(values, {})
+            rows += len(chunk)
+            chunk = list(itertools.islice(objects, chunk_size))
+        seconds = time.perf_counter() - start
+        return {"rows": rows, "seconds": seconds,
+                "rows_per_second": rows / seconds if seconds else 0.0}
+
+    def save(self):
+        """writes the pending changes in a single transaction"""
+        if getattr(self.__local, "depth", 0):
+            return
+        pending = self.__pending()
+        if not pending:
+            return
+        rows = {}
+        deleted = {}
+        for key, obj in pending.items():
+            name, id = key.split(".", 1)
+            if obj is None:
+                deleted.setdefault(name, []).append((id,))
+            else:
+                rows.setdefault(name, []).append((id, self.__dumps(obj)))
+        self.__write(rows, deleted)
+        pending.clear()
+
+    @contextmanager
+    def batch(self):
+        """writes the pending changes once, when the outermost block exits
+
+        save() calls made inside the block are deferred; the changes are
+        dropped instead if the block raises.
+        """
+        local = self.__local
+        local.depth = getattr(local, "depth", 0) + 1
+        try:
+            yield self
+        except:
+            local.depth -= 1
+            if local.depth == 0:
+                self.__pending().clear()
+                self.__objects().clear()
+            raise
+        local.depth -= 1
+        if local.depth == 0:
+            self.save()
+
+    def delete(self, obj=None):
+        """adds obj to the objects to delete on the next save"""
+        if obj is not None:
+            key = obj.__class__.__name__ + "." + obj.id
+            self.__objects().pop(key, None)
+            self.__pending()[key] = None
+
+    def reload(self):
+        """creates the tables, indexes and triggers that do not exist yet
+        """
+        conn = self.__connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        for name in classes:
+            conn.execute('CREATE TABLE IF NOT EXISTS "{}" '
+                         '(id TEXT PRIMARY KEY, data TEXT NOT NULL)'
+                         .format(name))
+            for attr in relations.get(name, ()):
+                conn.execute('CREATE INDEX IF NOT EXISTS "{0}_{1}" ON "{0}" '
+                             '(json_extract(data, \'$.{1}\'))'
+                             .format(name, attr))
+        conn.execute("CREATE TABLE IF NOT EXISTS generations "
+                     "(name TEXT PRIMARY KEY, generation INTEGER NOT NULL, "
+                     "updated_at TEXT NOT NULL)")
+        conn.execute("CREATE TABLE IF NOT EXISTS counts "
+                     "(name TEXT PRIMARY KEY, count INTEGER NOT NULL)")
+        for name in classes:
+            for event, change in [("INSERT", "+"), ("DELETE", "-")]:
+                conn.execute('CREATE TRIGGER IF NOT EXISTS "{0}_{1}" '
+                             'AFTER {1} ON "{0}" BEGIN '
+                             'UPDATE counts SET count = count {2} 1 '
+                             'WHERE name = \'{0}\'; END'
+                             .format(name, event, change))
+            conn.execute('INSERT OR IGNORE INTO counts '
+                         'SELECT ?, COUNT(*) FROM "{}"'.format(name), (name,))
+        self.__objects().clear()
+
+    def related(self, cls, attr, value):
+        """returns the objects of cls whose attribute attr equals value"""
+        objs = {}
+        names = self.__names(cls)
+        if names and attr in relations.get(names[0], ()):
+            name = names[0]
+            rows = self.__connection().execute(
+                'SELECT id, data FROM "{0}" '
+                'WHERE json_extract(data, \'$.{1}\') = ?'
+                .format(name, attr), (value,))
+            for id, data in rows:
+                key = name + "." + id
+                objs[key] = self.__object(key, data)
+        elif names:
+            objs = {key: obj for key, obj in self.all(cls).items()
+                    if getattr(obj, attr, None) == value}
+        for key, obj in self.__pending().items():
+            if key.split(".", 1)[0] in names:
+                if obj is None or getattr(obj, attr, None) != value:
+                    objs.pop(key, None)
+                else:
+                    objs[key] = obj
+        return objs
+
+    def track(self, obj, name, old):
+        """adds obj to the objects to write on the next save if it is loaded"""
+        key = obj.__class__.__name__ + "." + str(obj.__dict__.get("id"))
+        if self.__objects().get(key) is obj:
+            self.__pending()[key] = obj
+
+    def get(self, cls, id, load=None):
+        """
+        Method that retrieves on object
+        form class and id
+        :param cls: class name
+        :param id: string representation of the id
+        :param load: ignored, as in all()
+        :return: the object based on the class name and its ID,
+         or None if not found
+        """
+        if cls and id and type(cls) != str and cls.__name__ in classes:
+            key = cls.__name__ + "." + id
+            pending = self.__pending()
+            if key in pending:
+                return pending[key]
+            obj = self.__objects().get(key)
+            if obj is not None:
+                return obj
+            row = self.__connection().execute(
+                'SELECT data FROM "{}" WHERE id = ?'.format(cls.__name__),
+                (id,)).fetchone()
+            if row is not None:
+                return self.__object(key, row[0])
+
+        return None
+
+    def count(self, cls=None):
+        """
+        Method to count the number of objects in storage
+        :param cls: class name
+        :return: the number of objects in storage matching
+        the given class name. If no name is passed, returns
+        the count of all objects in storage.
+        Changes that were not saved yet are not counted.
+        """
+        counts = self.counts()
+        return sum(counts[name] for name in self.__names(cls))
+
+    def counts(self):
+        """returns the number of saved objects of every class, by name
+
+        The counts are kept in the file by triggers on the tables, so
+        reading them does not depend on the number of rows.
+        """
+        counts = dict.fromkeys(classes, 0)
+        counts.update(self.__connection().execute(
+            "SELECT name, count FROM counts"))
+        return counts
+
+    def refresh(self):
+        """does nothing: every lookup reads the database, which holds what
+        other processes wrote"""
+
+    def close(self):
+        """closes the connection of the thread and forgets its objects"""
+        local = self.__local
+        conn = getattr(local, "conn", None)
+        if conn is not None:
+            conn.close()
+        local.conn = None
+        local.path = None
+        local.objects = weakref.WeakValueDictionary()
+        local.pending = {}
+
+    def __connection(self):
+        """returns the connection of the current thread, opening it if needed
+        """
+        local = self.__local
+        if getattr(local, "conn", None) is None or \
+           local.path != self.__file_path:
+            if getattr(local, "conn", None) is not None:
+                local.conn.close()
+            local.conn = sqlite3.connect(self.__file_path,
+                                         timeout=self.timeout,
+                                         isolation_level=None)
+            local.conn.execute("PRAGMA synchronous=NORMAL")
+            local.path = self.__file_path
+        return local.conn
+
+    def __objects(self):
+        """returns the objects loaded by the current thread, by key"""
+        local = self.__local
+        if getattr(local, "objects", None) is None:
+            local.objects = weakref.WeakValueDictionary()
+        return local.objects
+
+    def __pending(self):
+        """returns the current thread's changes not saved yet, by key
+
+        Deleted objects are mapped to None.
+        """
+        local = self.__local
+        if getattr(local, "pending", None) is None:
+            local.pending = {}
+        return local.pending
+
+    def __names(self, cls):
+        """returns the names of the tables holding the objects of cls"""
+        if cls is None:
+            return list(classes)
+        if type(cls) != str:
+            cls = cls.__name__
+        return [cls] if cls in classes else []
+
+    def __object(self, key, data):
+        """returns the loaded object of key, building it from data if needed
+        """
+        objects = self.__objects()
+        obj = objects.get(key)
+        if obj is None:
+            record = self.codec.loads(data)
+            obj = classes[record["__class__"]](**record)
+            objects[key] = obj
+        return obj
+
+    def __overlay(self, objs, cls):
+        """applies the pending changes of objects of cls to objs"""
+        names = self.__names(cls)
+        for key, obj in self.__pending().items():
+            if key.split(".", 1)[0] in names:
+                if obj is None:
+                    objs.pop(key, None)
+                else:
+                    objs[key] = obj
+        return objs
+
+    def __write(self, rows, deleted):
+        """deletes the ids in deleted and writes the (id, data) rows in
+        rows, both by table, in a single transaction bumping the generation
+        of each table"""
+        conn = self.__connection()
+        now = datetime.utcnow().isoformat()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "INSERT INTO generations VALUES (?, 1, ?) "
+                "ON CONFLICT(name) DO UPDATE SET "
+                "generation = generation + 1, "
+                "updated_at = excluded.updated_at",
+                [(name, now) for name in set(rows) | set(deleted)])
+            for name, ids in deleted.items():
+                conn.executemany(
+                    'DELETE FROM "{}" WHERE id = ?'.format(name), ids)
+            for name, values in rows.items():
+                conn.executemany(
+                    'INSERT INTO "{}" (id, data) VALUES (?, ?) '
+                    'ON CONFLICT(id) DO UPDATE SET data = excluded.data'
+                    .format(name), values)
+        except:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def __dumps(self, obj):
+        """returns the record of obj encoded as JSON text"""
+        record = obj.__dict__.copy()
+        record.pop("_sa_instance_state", None)
+        record["__class__"] = obj.__class__.__name__
+        return self.codec.dumps(record).decode()
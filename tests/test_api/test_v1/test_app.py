@@ -0,0 +1,421 @@
+#!/usr/bin/python3
+"""
+Contains the TestAppDocs, TestAppConcurrency, SavedStateTestCase,
+TestRefresh, TestListRoutes, TestConditionalRequests, TestResponseCache,
+TestStats, TestPoolStats, TestResponseCacheStats and TestCacheStats
+classes
+"""
+
+from api.v1 import app as app_module
+from api.v1.views import response_cache
+from datetime import datetime
+import json
+import models
+from models.city import City
+from models.engine.cache import LRUCache
+from models.state import State
+import os
+import pep8
+import threading
+import unittest
+from unittest import mock
+app = app_module.app
+
+
+class TestAppDocs(unittest.TestCase):
+    """Tests to check the documentation and style of the API app"""
+    def test_pep8_conformance_app(self):
+        """Test that api/v1/app.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['api/v1/app.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_app(self):
+        """Test that tests/test_api/test_v1/test_app.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_api/test_v1/test_app.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_app_module_docstring(self):
+        """Test for the app.py module docstring"""
+        self.assertIsNot(app_module.__doc__, None,
+                         "app.py needs a docstring")
+        self.assertTrue(len(app_module.__doc__) >= 1,
+                        "app.py needs a docstring")
+
+
+@unittest.skipIf(models.storage_t in ('db', 'sqlite'),
+                 "not testing file storage")
+class TestAppConcurrency(unittest.TestCase):
+    """Test the API under requests coming from many threads"""
+    def setUp(self):
+        """Point the storage to a file of its own"""
+        self.path = "file_api_test.json"
+        models.storage._FileStorage__file_path = self.path
+
+    def tearDown(self):
+        """Forget the objects of the test and remove its files"""
+        for state in list(models.storage.all(State).values()):
+            if state.name.startswith("stress"):
+                models.storage.delete(state)
+        del models.storage._FileStorage__file_path
+        for suffix in ["", ".log", ".log.old", ".tmp"]:
+            if os.path.exists(self.path + suffix):
+                os.remove(self.path + suffix)
+
+    def test_concurrent_writes_and_reads(self):
+        """Test that concurrent requests neither fail nor corrupt the file"""
+        errors = []
+        kept = []
+
+        def worker(n):
+            """creates, updates, lists and deletes states"""
+            client = app.test_client()
+            try:
+                for i in range(20):
+                    name = "stress_{}_{}".format(n, i)
+                    resp = client.post('/api/v1/states', json={'name': name})
+                    self.assertEqual(resp.status_code, 201)
+                    state_id = resp.get_json()['id']
+                    resp = client.put('/api/v1/states/' + state_id,
+                                      json={'name': name + "_put"})
+                    self.assertEqual(resp.status_code, 200)
+                    self.assertEqual(client.get('/api/v1/states').status_code,
+                                     200)
+                    self.assertEqual(client.get('/api/v1/stats').status_code,
+                                     200)
+                    if i % 2:
+                        resp = client.delete('/api/v1/states/' + state_id)
+                        self.assertEqual(resp.status_code, 200)
+                    else:
+                        kept.append(state_id)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(n,))
+                   for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        with open(self.path, "r") as f:
+            saved = json.load(f)
+        stress = {key for key, value in saved.items()
+                  if value.get("name", "").startswith("stress")}
+        self.assertEqual(stress, {"State." + state_id for state_id in kept})
+        for key in stress:
+            self.assertTrue(saved[key]["name"].endswith("_put"))
+
+
+class SavedStateTestCase(unittest.TestCase):
+    """Base of the tests of routes serving a saved state and its cities"""
+    def setUp(self):
+        """Save a state with five cities"""
+        if models.storage_t not in ('db', 'sqlite'):
+            self.path = "file_api_test.json"
+            models.storage._FileStorage__file_path = self.path
+        self.state = State(name="paged")
+        self.cities = [City(name=str(i), state_id=self.state.id)
+                       for i in range(5)]
+        for obj in [self.state] + self.cities:
+            models.storage.new(obj)
+        models.storage.save()
+        self.client = app.test_client()
+
+    def tearDown(self):
+        """Remove the objects of the test, and its files"""
+        models.storage.close()
+        for city in self.cities:
+            models.storage.delete(models.storage.get(City, city.id))
+        models.storage.delete(models.storage.get(State, self.state.id))
+        models.storage.save()
+        models.storage.close()
+        if models.storage_t not in ('db', 'sqlite'):
+            del models.storage._FileStorage__file_path
+            for suffix in ["", ".log", ".log.old", ".tmp"]:
+                if os.path.exists(self.path + suffix):
+                    os.remove(self.path + suffix)
+
+
+@unittest.skipIf(models.storage_t in ('db', 'sqlite'),
+                 "not testing file storage")
+class TestRefresh(SavedStateTestCase):
+    """Test that requests see what other workers wrote"""
+    def test_request_reads_other_writes(self):
+        """Test that a request is served from the file as it is now"""
+        with open(self.path, "r") as f:
+            saved = json.load(f)
+        saved["State." + self.state.id]["name"] = "renamed"
+        with open(self.path + ".tmp", "w") as f:
+            json.dump(saved, f)
+        os.replace(self.path + ".tmp", self.path)
+        resp = self.client.get('/api/v1/states/' + self.state.id)
+        self.assertEqual(resp.get_json()["name"], "renamed")
+
+
+class TestListRoutes(SavedStateTestCase):
+    """Test the pagination and streaming of the list routes"""
+    def walk(self, url):
+        """returns the pages found by following the next links from url"""
+        pages = []
+        while url:
+            resp = self.client.get(url)
+            self.assertEqual(resp.status_code, 200)
+            pages.append([obj["id"] for obj in resp.get_json()])
+            url = resp.headers.get("Link", "<>").split(">")[0][1:]
+        return pages
+
+    def test_pages(self):
+        """Test that the pages list every object once, ordered by id"""
+        pages = self.walk('/api/v1/states/{}/cities?limit=2'.format(
+            self.state.id))
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+        self.assertEqual(sum(pages, []),
+                         sorted(city.id for city in self.cities))
+        pages = self.walk('/api/v1/states?limit=1')
+        ids = sorted(state.id
+                     for state in models.storage.all(State).values())
+        self.assertEqual(sum(pages, []), ids)
+        resp = self.client.get('/api/v1/states')
+        self.assertNotIn("Link", resp.headers)
+        self.assertEqual(len(resp.get_json()), len(ids))
+
+    def test_invalid_parameters(self):
+        """Test that bad limits, cursors and parents are refused"""
+        for query in ["limit=0", "limit=1001", "limit=two", "cursor=a",
+                      "cursor=_w", "cursor=!!!", "cursor=YR", "cursor=YQ==",
+                      "cursor=Y%0AQ"]:
+            resp = self.client.get('/api/v1/amenities?' + query)
+            self.assertEqual(resp.status_code, 400, query)
+        resp = self.client.get('/api/v1/states/nope/cities?limit=2')
+        self.assertEqual(resp.status_code, 404)
+
+    def test_stream_json(self):
+        """Test that stream=true streams the same list as a JSON array"""
+        url = '/api/v1/states/{}/cities'.format(self.state.id)
+        resp = self.client.get(url + '?stream=true')
+        self.assertNotIn("Content-Length", resp.headers)
+        self.assertEqual(resp.mimetype, "application/json")
+        self.assertCountEqual(resp.get_json(),
+                              self.client.get(url).get_json())
+        resp = self.client.get('/api/v1/states?stream=1')
+        self.assertEqual(len(resp.get_json()), models.storage.count(State))
+        resp = self.client.get('/api/v1/states/nope/cities?stream=1')
+        self.assertEqual(resp.status_code, 404)
+
+    def test_stream_ndjson(self):
+        """Test that NDJSON is streamed to clients preferring it"""
+        url = '/api/v1/states/{}/cities'.format(self.state.id)
+        resp = self.client.get(url,
+                               headers={"Accept": "application/x-ndjson"})
+        self.assertNotIn("Content-Length", resp.headers)
+        self.assertEqual(resp.mimetype, "application/x-ndjson")
+        lines = resp.get_data(as_text=True).splitlines()
+        self.assertCountEqual([json.loads(line)["id"] for line in lines],
+                              [city.id for city in self.cities])
+        resp = self.client.get(url, headers={
+            "Accept": "application/json, application/x-ndjson;q=0.5"})
+        self.assertIn("Content-Length", resp.headers)
+
+
+class TestConditionalRequests(SavedStateTestCase):
+    """Test the ETag and Last-Modified headers of the GET routes"""
+    def test_object(self):
+        """Test that an object is not sent again until it changes"""
+        url = '/api/v1/states/' + self.state.id
+        resp = self.client.get(url)
+        etag = resp.headers["ETag"]
+        last_modified = resp.headers["Last-Modified"]
+        resp = self.client.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp.get_data(), b"")
+        self.assertEqual(resp.headers["ETag"], etag)
+        resp = self.client.get(url, headers={
+            "If-Modified-Since": last_modified})
+        self.assertEqual(resp.status_code, 304)
+        self.client.put(url, json={"name": "changed"})
+        resp = self.client.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotEqual(resp.headers["ETag"], etag)
+        self.assertEqual(resp.get_json()["name"], "changed")
+
+    def test_object_changed_within_a_second(self):
+        """Test that an object changed twice with the same updated_at, as a
+        database keeping seconds only stores it, gets a new version"""
+        moment = datetime(2026, 1, 1)
+
+        class Frozen(datetime):
+            """datetime whose clock stands still"""
+            @classmethod
+            def utcnow(cls):
+                """returns the same moment on every call"""
+                return moment
+
+            @classmethod
+            def fromisoformat(cls, text):
+                """parses text into a plain datetime"""
+                return datetime.fromisoformat(text)
+
+        url = '/api/v1/states/' + self.state.id
+        with mock.patch("models.base_model.datetime", Frozen):
+            self.client.put(url, json={"name": "first"})
+            etag = self.client.get(url).headers["ETag"]
+            self.client.put(url, json={"name": "second"})
+        resp = self.client.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.get_json()["name"], "second")
+
+    def test_list_representations(self):
+        """Test that each representation of a list has a version of its
+        own, and that list responses vary with the Accept header"""
+        url = '/api/v1/states/{}/cities'.format(self.state.id)
+        ndjson = {"Accept": "application/x-ndjson"}
+        resps = [self.client.get(url), self.client.get(url, headers=ndjson),
+                 self.client.get(url + "?stream=true")]
+        etags = [resp.headers["ETag"] for resp in resps]
+        self.assertEqual(len(set(etags)), 3)
+        for resp in resps:
+            self.assertIn("Accept", resp.headers["Vary"])
+        resp = self.client.get(url, headers={"If-None-Match": etags[1],
+                                             "Accept": "application/json"})
+        self.assertEqual(resp.status_code, 200)
+        resp = self.client.get(url, headers=dict(ndjson, **{
+            "If-None-Match": etags[1]}))
+        self.assertEqual(resp.status_code, 304)
+
+    def test_list(self):
+        """Test that a list is not sent again until one of its class
+        changes"""
+        url = '/api/v1/states/{}/cities'.format(self.state.id)
+        etag = self.client.get(url).headers["ETag"]
+        for query in ["", "?limit=2"]:
+            resp = self.client.get(url + query,
+                                   headers={"If-None-Match": etag})
+            self.assertEqual(resp.status_code, 304, query)
+            self.assertIn("Accept", resp.headers["Vary"])
+        resp = self.client.get('/api/v1/states', headers={
+            "If-None-Match": etag})
+        self.assertEqual(resp.status_code, 200)
+        self.client.put('/api/v1/cities/' + self.cities[0].id,
+                        json={"name": "changed"})
+        resp = self.client.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(resp.status_code, 200)
+        etag = resp.headers["ETag"]
+        self.client.delete('/api/v1/cities/' + self.cities[1].id)
+        resp = self.client.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(resp.get_json()), 4)
+        resp = self.client.get('/api/v1/states/nope/cities',
+                               headers={"If-None-Match": etag})
+        self.assertEqual(resp.status_code, 404)
+
+
+class TestResponseCache(SavedStateTestCase):
+    """Test the cache of the GET responses"""
+    def setUp(self):
+        """Give each test an empty response cache"""
+        super().setUp()
+        self.saved_cache = response_cache.cache
+        response_cache.cache = LRUCache(100)
+
+    def tearDown(self):
+        """Restore the response cache"""
+        response_cache.cache = self.saved_cache
+        super().tearDown()
+
+    def stats(self):
+        """returns the statistics served for the response cache"""
+        resp = self.client.get('/api/v1/stats/responses')
+        self.assertEqual(resp.status_code, 200)
+        return resp.get_json()
+
+    def test_hits(self):
+        """Test that a response is served again until its classes change"""
+        url = '/api/v1/states/{}/cities'.format(self.state.id)
+        body = self.client.get(url).get_data()
+        before = self.stats()
+        resp = self.client.get(url)
+        self.assertEqual(resp.get_data(), body)
+        resp = self.client.get(url, headers={
+            "If-None-Match": resp.headers["ETag"]})
+        self.assertEqual(resp.status_code, 304)
+        self.client.get('/api/v1/amenities')
+        self.client.put('/api/v1/amenities/nope', json={"name": "n"})
+        self.assertEqual(self.client.get(url).get_data(), body)
+        stats = self.stats()
+        self.assertEqual(stats["hits"] - before["hits"], 3)
+        self.assertEqual(stats["invalidations"], before["invalidations"])
+        self.assertGreater(stats["hit_rate"], 0)
+
+    def test_invalidation(self):
+        """Test that writes to a class or a parent drop the responses"""
+        url = '/api/v1/states/{}/cities'.format(self.state.id)
+        self.client.get(url)
+        before = self.stats()
+        self.client.put('/api/v1/cities/' + self.cities[0].id,
+                        json={"name": "changed"})
+        names = [city["name"] for city in self.client.get(url).get_json()]
+        self.assertIn("changed", names)
+        self.assertEqual(self.stats()["invalidations"] -
+                         before["invalidations"], 1)
+        self.client.delete('/api/v1/states/' + self.state.id)
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_streams_are_not_kept(self):
+        """Test that streamed responses skip the cache"""
+        self.client.get('/api/v1/states?stream=true')
+        self.client.get('/api/v1/states?stream=true')
+        self.assertEqual(self.stats()["size"], 0)
+
+
+class TestStats(SavedStateTestCase):
+    """Test the /stats endpoint"""
+    def test_stats(self):
+        """Test that the counts of every class are served in one call"""
+        with mock.patch.object(models.storage, "count",
+                               side_effect=AssertionError):
+            resp = self.client.get('/api/v1/stats')
+        self.assertEqual(resp.status_code, 200)
+        stats = resp.get_json()
+        self.assertEqual(stats["states"], models.storage.count(State))
+        self.assertEqual(stats["cities"], models.storage.count(City))
+        self.assertEqual(len(stats), 6)
+
+
+class TestPoolStats(unittest.TestCase):
+    """Test the /stats/pool endpoint"""
+    def test_pool_stats(self):
+        """Test that the pool statistics are served by the DB storage only"""
+        resp = app.test_client().get('/api/v1/stats/pool')
+        if models.storage_t == 'db':
+            self.assertEqual(resp.status_code, 200)
+            self.assertIs(type(resp.get_json()), dict)
+        else:
+            self.assertEqual(resp.status_code, 404)
+
+
+class TestResponseCacheStats(unittest.TestCase):
+    """Test the /stats/responses endpoint"""
+    def test_response_cache_stats(self):
+        """Test that the counters are served when the cache is enabled"""
+        resp = app.test_client().get('/api/v1/stats/responses')
+        if response_cache.cache is None:
+            self.assertEqual(resp.status_code, 404)
+        else:
+            self.assertIn("hit_rate", resp.get_json())
+
+
+class TestCacheStats(unittest.TestCase):
+    """Test the /stats/cache endpoint"""
+    def test_cache_stats(self):
+        """Test that the cache counters are served when a cache is used"""
+        resp = app.test_client().get('/api/v1/stats/cache')
+        stats = getattr(models.storage, "cache_stats", lambda: None)()
+        if stats is None:
+            self.assertEqual(resp.status_code, 404)
+        else:
+            self.assertEqual(resp.status_code, 200)
+            self.assertIn("hits", resp.get_json())
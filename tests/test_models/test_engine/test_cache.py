@@ -0,0 +1,93 @@
+#!/usr/bin/python3
+"""
+Contains the TestCacheDocs and TestLRUCache classes
+"""
+
+import inspect
+from models.engine import cache
+import pep8
+import unittest
+from unittest import mock
+LRUCache = cache.LRUCache
+
+
+class TestCacheDocs(unittest.TestCase):
+    """Tests to check the documentation and style of the cache module"""
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.cache_f = inspect.getmembers(LRUCache, inspect.isfunction)
+
+    def test_pep8_conformance(self):
+        """Test that cache.py and its tests conform to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files([
+            'models/engine/cache.py',
+            'tests/test_models/test_engine/test_cache.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_module_docstring(self):
+        """Test for the cache.py module docstring"""
+        self.assertIsNot(cache.__doc__, None, "cache.py needs a docstring")
+        self.assertTrue(len(cache.__doc__) >= 1, "cache.py needs a docstring")
+
+    def test_class_docstring(self):
+        """Test for the LRUCache class docstring"""
+        self.assertIsNot(LRUCache.__doc__, None,
+                         "LRUCache class needs a docstring")
+        self.assertTrue(len(LRUCache.__doc__) >= 1,
+                        "LRUCache class needs a docstring")
+
+    def test_func_docstrings(self):
+        """Test for the presence of docstrings in LRUCache methods"""
+        for func in self.cache_f:
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} method needs a docstring".format(func[0]))
+            self.assertTrue(len(func[1].__doc__) >= 1,
+                            "{:s} method needs a docstring".format(func[0]))
+
+
+class TestLRUCache(unittest.TestCase):
+    """Test the LRUCache class"""
+    def test_get_put_pop(self):
+        """Test that values are found until popped or cleared"""
+        lru = LRUCache(10, 60)
+        self.assertIsNone(lru.get("a"))
+        self.assertEqual(lru.get("a", 0), 0)
+        lru.put("a", 1)
+        lru.put("b", 2)
+        self.assertEqual(lru.get("a"), 1)
+        lru.pop("a")
+        lru.pop("missing")
+        self.assertIsNone(lru.get("a"))
+        lru.clear()
+        self.assertIsNone(lru.get("b"))
+        stats = lru.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["size"]),
+                         (1, 4, 0))
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first"""
+        lru = LRUCache(2, 60)
+        lru.put("a", 1)
+        lru.put("b", 2)
+        lru.get("a")
+        lru.put("c", 3)
+        self.assertIsNone(lru.get("b"))
+        self.assertEqual(lru.get("a"), 1)
+        self.assertEqual(lru.get("c"), 3)
+        self.assertEqual(lru.stats()["evictions"], 1)
+        self.assertEqual(lru.stats()["size"], 2)
+
+    def test_ttl(self):
+        """Test that entries expire after ttl seconds"""
+        lru = LRUCache(10, 5)
+        with mock.patch("time.monotonic", return_value=100):
+            lru.put("a", 1)
+        with mock.patch("time.monotonic", return_value=104):
+            self.assertEqual(lru.get("a"), 1)
+        with mock.patch("time.monotonic", return_value=106):
+            self.assertIsNone(lru.get("a"))
+        stats = lru.stats()
+        self.assertEqual((stats["expirations"], stats["size"]), (1, 0))
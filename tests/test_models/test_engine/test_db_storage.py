@@ -7,6 +7,7 @@ from datetime import datetime
 import inspect
 import models
 from models.engine import db_storage
+from models.engine.pool import InstrumentedQueuePool
 from models.amenity import Amenity
 from models.base_model import BaseModel
 from models.city import City
@@ -17,7 +18,9 @@ from models.user import User
 import json
 import os
 import pep8
+import sqlalchemy
 import unittest
+from unittest import mock
 DBStorage = db_storage.DBStorage
 classes = {"Amenity": Amenity, "City": City, "Place": Place,
            "Review": Review, "State": State, "User": User}
@@ -82,3 +85,397 @@ class TestFileStorage(unittest.TestCase):
 
     def test_save(self):
         """Test that save properly saves objects to file.json"""
+
+
+class TestDBStorageURL(unittest.TestCase):
+    """Test how DBStorage connects to the database of HBNB_DB_URL"""
+    def test_engine_options(self):
+        """Test that SQLite sessions can share connections across threads"""
+        options = DBStorage._DBStorage__engine_options
+        for url in ["sqlite://", "sqlite:///:memory:"]:
+            with self.subTest(url=url):
+                self.assertIs(options(url)["poolclass"],
+                              sqlalchemy.pool.StaticPool)
+        file_options = options("sqlite:///hbnb.db")
+        self.assertIs(file_options["poolclass"], InstrumentedQueuePool)
+        self.assertFalse(file_options["connect_args"]["check_same_thread"])
+
+    def test_pool_options(self):
+        """Test that the pool settings come from the environment"""
+        options = DBStorage._DBStorage__engine_options
+        url = "mysql+mysqldb://u:p@localhost/hbnb"
+        defaults = options(url)
+        self.assertNotIn("connect_args", defaults)
+        self.assertIs(defaults["poolclass"], InstrumentedQueuePool)
+        self.assertEqual(defaults["pool_size"], 5)
+        self.assertFalse(defaults["pool_pre_ping"])
+        env = {"HBNB_DB_POOL_SIZE": "20", "HBNB_DB_MAX_OVERFLOW": "0",
+               "HBNB_DB_POOL_TIMEOUT": "2.5", "HBNB_DB_POOL_RECYCLE": "60",
+               "HBNB_DB_POOL_PRE_PING": "1"}
+        with mock.patch.dict(os.environ, env):
+            tuned = options(url)
+        self.assertEqual(tuned["pool_size"], 20)
+        self.assertEqual(tuned["max_overflow"], 0)
+        self.assertEqual(tuned["pool_timeout"], 2.5)
+        self.assertEqual(tuned["pool_recycle"], 60)
+        self.assertTrue(tuned["pool_pre_ping"])
+
+
+@unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+class TestDBStorage(unittest.TestCase):
+    """Test the DBStorage class against the database of HBNB_DB_URL"""
+    def setUp(self):
+        """Create a state and a user in the database"""
+        self.state = State(name="California")
+        self.user = User(email="a@b.c", password="pwd")
+        for obj in [self.state, self.user]:
+            models.storage.new(obj)
+        models.storage.save()
+
+    def tearDown(self):
+        """Remove the objects of the test, their children by cascade"""
+        models.storage.close()
+        for cls in [Amenity, State, User]:
+            for obj in models.storage.all(cls).values():
+                models.storage.delete(obj)
+        models.storage.save()
+        models.storage.close()
+
+    def test_get(self):
+        """Test that get returns the object with the id, or None"""
+        self.assertIs(models.storage.get(State, self.state.id), self.state)
+        models.storage.close()
+        state = models.storage.get(State, self.state.id)
+        self.assertIsNot(state, self.state)
+        self.assertEqual(state.name, "California")
+        self.assertIsNone(models.storage.get(State, "nope"))
+        self.assertIsNone(models.storage.get(City, self.state.id))
+        self.assertIsNone(models.storage.get("State", self.state.id))
+
+    def test_count(self):
+        """Test that count counts one class, or all of them"""
+        self.assertEqual(models.storage.count(State), 1)
+        self.assertEqual(models.storage.count("User"), 1)
+        self.assertEqual(models.storage.count(City), 0)
+        self.assertEqual(models.storage.count(), 2)
+        models.storage.new(State(name="Nevada"))
+        self.assertEqual(models.storage.count(State), 2)
+
+    def test_counts(self):
+        """Test that counts counts every class"""
+        counts = models.storage.counts()
+        self.assertEqual(counts, {"Amenity": 0, "City": 0, "Place": 0,
+                                  "Review": 0, "State": 1, "User": 1})
+
+    def test_batch(self):
+        """Test that batch commits once, and rolls back on errors"""
+        with self.assertRaises(KeyError):
+            with models.storage.batch():
+                State(name="Nevada").save()
+                raise KeyError
+        self.assertEqual(models.storage.count(State), 1)
+        with models.storage.batch():
+            State(name="Nevada").save()
+        models.storage.close()
+        self.assertEqual(models.storage.count(State), 2)
+
+    def test_bulk_new(self):
+        """Test that bulk_new inserts each chunk in its own transaction,
+        each followed by the one bumping the generations"""
+        cities = [City(name=str(i), state_id=self.state.id) for i in range(5)]
+        commits = []
+
+        def commit(conn):
+            """records each commit sent to the database"""
+            commits.append(conn)
+
+        engine = models.storage._DBStorage__engine
+        sqlalchemy.event.listen(engine, "commit", commit)
+        try:
+            stats = models.storage.bulk_new(iter(cities), chunk_size=2)
+        finally:
+            sqlalchemy.event.remove(engine, "commit", commit)
+        self.assertEqual(len(commits), 6)
+        self.assertEqual(stats["rows"], 5)
+        self.assertGreater(stats["rows_per_second"], 0)
+        models.storage.close()
+        self.assertEqual(models.storage.count(City), 5)
+        state = models.storage.get(State, self.state.id)
+        self.assertEqual(len(state.cities), 5)
+
+    def test_generation(self):
+        """Test that commits bump the generation of the classes they change,
+        cascades included"""
+        states = models.storage.generation(State)
+        users = models.storage.generation("User")
+        cities = models.storage.generation(City)
+        self.assertIsNotNone(states[1])
+        models.storage.new(City(name="c", state_id=self.state.id))
+        self.assertEqual(models.storage.generation(City), cities)
+        models.storage.save()
+        self.assertNotEqual(models.storage.generation(City), cities)
+        cities = models.storage.generation(City)
+        models.storage.close()
+        models.storage.delete(models.storage.get(State, self.state.id))
+        models.storage.save()
+        self.assertNotEqual(models.storage.generation(State), states)
+        self.assertNotEqual(models.storage.generation(City), cities)
+        self.assertEqual(models.storage.generation(User), users)
+
+    def test_generation_bumped_after_commit(self):
+        """Test that the generations are bumped in a transaction of their
+        own, after the commit of the write"""
+        events = []
+
+        def execute(*args):
+            """records each statement sent to the database"""
+            events.append(args[2].split()[0].upper())
+
+        def commit(conn):
+            """records each commit sent to the database"""
+            events.append("COMMIT")
+
+        engine = models.storage._DBStorage__engine
+        sqlalchemy.event.listen(engine, "before_cursor_execute", execute)
+        sqlalchemy.event.listen(engine, "commit", commit)
+        try:
+            models.storage.new(City(name="c", state_id=self.state.id))
+            models.storage.save()
+        finally:
+            sqlalchemy.event.remove(engine, "before_cursor_execute", execute)
+            sqlalchemy.event.remove(engine, "commit", commit)
+        self.assertEqual(events, ["INSERT", "COMMIT", "UPDATE", "COMMIT"])
+
+    def test_generations(self):
+        """Test that generations reads the generations of several classes
+        with one statement"""
+        statements = []
+
+        def count(*args):
+            """records each statement sent to the database"""
+            statements.append(args[2])
+
+        engine = models.storage._DBStorage__engine
+        sqlalchemy.event.listen(engine, "before_cursor_execute", count)
+        try:
+            found = models.storage.generations([State, "City", "User"])
+            self.assertEqual(len(statements), 1)
+        finally:
+            sqlalchemy.event.remove(engine, "before_cursor_execute", count)
+        self.assertEqual(found, {"State": models.storage.generation(State),
+                                 "City": models.storage.generation(City),
+                                 "User": models.storage.generation(User)})
+        self.assertEqual(models.storage.generations([]), {})
+
+    def test_page(self):
+        """Test that page returns the rows after an id, by id"""
+        cities = [City(name=str(i), state_id=self.state.id) for i in range(5)]
+        for city in cities:
+            models.storage.new(city)
+        models.storage.save()
+        ids = sorted(city.id for city in cities)
+        page = models.storage.page(City, 2, attr="state_id",
+                                   value=self.state.id)
+        self.assertEqual([city.id for city in page], ids[:2])
+        page = models.storage.page("City", 10, ids[1], "state_id",
+                                   self.state.id)
+        self.assertEqual([city.id for city in page], ids[2:])
+        self.assertEqual(models.storage.page(City, 10, attr="state_id",
+                                             value="nope"), [])
+        self.assertEqual(models.storage.page("Unknown", 10), [])
+
+    def test_load(self):
+        """Test that load fetches relationships in a bounded number of
+        queries, however many parents there are"""
+        for i in range(3):
+            state = State(name=str(i))
+            models.storage.new(state)
+            for j in range(2):
+                city = City(name=str(j), state_id=state.id)
+                models.storage.new(city)
+                models.storage.new(Place(name="p", city_id=city.id,
+                                         user_id=self.user.id))
+        models.storage.save()
+        statements = []
+
+        def count(*args):
+            """records each statement sent to the database"""
+            statements.append(args[2])
+
+        engine = models.storage._DBStorage__engine
+        sqlalchemy.event.listen(engine, "before_cursor_execute", count)
+        try:
+            models.storage.close()
+            states = models.storage.all(State).values()
+            self.assertEqual(sum(len(state.cities) for state in states), 6)
+            self.assertEqual(len(statements), 5)
+            del statements[:]
+            models.storage.close()
+            states = models.storage.all(State, load=["cities.places"])
+            self.assertEqual(sum(len(city.places)
+                                 for state in states.values()
+                                 for city in state.cities), 6)
+            self.assertEqual(len(statements), 3)
+            del statements[:]
+            models.storage.close()
+            state = models.storage.get(State, self.state.id, load=["cities"])
+            self.assertEqual(state.cities, [])
+            self.assertEqual(len(statements), 2)
+        finally:
+            sqlalchemy.event.remove(engine, "before_cursor_execute", count)
+
+    def test_iter(self):
+        """Test that iter streams the rows without keeping them loaded"""
+        with models.storage.batch():
+            for i in range(5):
+                State(name=str(i)).save()
+        models.storage.close()
+        session = models.storage._DBStorage__session
+        ids = []
+        for state in models.storage.iter(State, batch_size=2):
+            ids.append(state.id)
+        self.assertEqual(len(ids), 6)
+        self.assertIn(self.state.id, ids)
+        self.assertLessEqual(len(session.identity_map), 2)
+        self.assertEqual(len(list(models.storage.iter())), 7)
+        self.assertEqual(list(models.storage.iter("City")), [])
+
+    def test_pool_stats(self):
+        """Test that pool_stats reports the state of the pool"""
+        stats = models.storage.pool_stats()
+        self.assertIs(type(stats), dict)
+        if "checkouts" in stats:
+            self.assertGreater(stats["checkouts"], 0)
+
+
+@unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+class TestDBStorageReplicas(unittest.TestCase):
+    """Test DBStorage with two SQLite files as primary and replica"""
+    primary = "file_primary_test.db"
+    replica = "file_replica_test.db"
+
+    def setUp(self):
+        """Create the replica's tables and a storage using both files"""
+        engine = sqlalchemy.create_engine("sqlite:///" + self.replica)
+        models.base_model.Base.metadata.create_all(engine)
+        engine.dispose()
+        env = {"HBNB_DB_URL": "sqlite:///" + self.primary,
+               "HBNB_DB_REPLICA_URLS": " sqlite:///" + self.replica + ", "}
+        with mock.patch.dict(os.environ, env):
+            os.environ.pop("HBNB_ENV", None)
+            self.storage = DBStorage()
+        self.storage.reload()
+
+    def tearDown(self):
+        """Close the storage and remove both files"""
+        self.storage.close()
+        for path in [self.primary, self.replica]:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_reads_go_to_the_replica(self):
+        """Test that reads use the replica until the session writes"""
+        state = State(name="California")
+        self.storage.new(state)
+        self.storage.save()
+        self.assertIs(self.storage.get(State, state.id), state)
+        self.assertEqual(self.storage.count(State), 1)
+        self.storage.close()
+        self.assertIsNone(self.storage.get(State, state.id))
+        self.assertEqual(self.storage.count(), 0)
+        self.assertEqual(self.storage.all(State), {})
+        self.storage.close()
+        self.storage.new(State(name="Nevada"))
+        self.assertEqual(self.storage.count(State), 2)
+
+    def test_pool_stats(self):
+        """Test that the replica's pool is reported along the primary's"""
+        self.storage.count()
+        stats = self.storage.pool_stats()
+        self.assertEqual(len(stats["replicas"]), 1)
+        self.assertEqual(stats["replicas"][0]["checkouts"], 1)
+
+
+@unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+class TestDBStorageCache(unittest.TestCase):
+    """Test the object cache of DBStorage"""
+    path = "file_cache_test.db"
+
+    def setUp(self):
+        """Create a storage with a cache, and count its statements"""
+        env = {"HBNB_DB_URL": "sqlite:///" + self.path,
+               "HBNB_DB_CACHE_SIZE": "100"}
+        with mock.patch.dict(os.environ, env):
+            os.environ.pop("HBNB_ENV", None)
+            self.storage = DBStorage()
+        self.storage.reload()
+        self.state = State(name="California")
+        self.storage.new(self.state)
+        self.storage.save()
+        self.storage.close()
+        self.statements = []
+        sqlalchemy.event.listen(self.storage._DBStorage__engine,
+                                "before_cursor_execute", self.count)
+
+    def tearDown(self):
+        """Close the storage and remove its file"""
+        self.storage.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def count(self, *args):
+        """records each statement sent to the database"""
+        self.statements.append(args[2])
+
+    def test_get(self):
+        """Test that get is answered by the cache after the first request"""
+        state = self.storage.get(State, self.state.id)
+        self.storage.close()
+        self.assertEqual(len(self.statements), 1)
+        cached = self.storage.get(State, self.state.id)
+        self.assertIsNot(cached, state)
+        self.assertEqual(cached.name, "California")
+        self.assertIs(self.storage.get(State, self.state.id), cached)
+        self.assertEqual(len(self.statements), 1)
+        stats = self.storage.cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+
+    def test_all(self):
+        """Test that class lists are answered by the cache"""
+        self.storage.all(State)
+        self.storage.close()
+        self.assertEqual(len(self.statements), 1)
+        states = self.storage.all(State)
+        self.assertEqual(len(self.statements), 1)
+        self.assertEqual([state.name for state in states.values()],
+                         ["California"])
+        self.storage.all(State, load=["cities"])
+        self.assertEqual(len(self.statements), 3)
+
+    def test_invalidation(self):
+        """Test that writes through the storage drop what they change"""
+        self.storage.all(State)
+        self.storage.get(State, self.state.id).name = "Nevada"
+        self.storage.save()
+        self.storage.close()
+        self.assertEqual(self.storage.get(State, self.state.id).name,
+                         "Nevada")
+        self.assertEqual(len(self.storage.all(State)), 1)
+        self.storage.new(State(name="Oregon"))
+        self.storage.save()
+        self.storage.close()
+        self.assertEqual(len(self.storage.all(State)), 2)
+        self.storage.delete(self.storage.get(State, self.state.id))
+        self.storage.save()
+        self.storage.close()
+        self.assertIsNone(self.storage.get(State, self.state.id))
+        self.assertEqual(len(self.storage.all(State)), 1)
+
+    def test_reads_after_writes(self):
+        """Test that a session that wrote reads from the database"""
+        self.storage.get(State, self.state.id)
+        self.storage.close()
+        self.storage.new(State(name="Oregon"))
+        self.assertEqual(len(self.storage.all(State)), 2)
+        self.storage.get(State, self.state.id)
+        self.assertEqual(self.storage.cache_stats()["hits"], 0)
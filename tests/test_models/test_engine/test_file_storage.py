@@ -4,6 +4,7 @@ Contains the TestFileStorageDocs classes
 """
 
 from datetime import datetime
+import glob
 import inspect
 import models
 from models.engine import file_storage
@@ -15,9 +16,11 @@ from models.review import Review
 from models.state import State
 from models.user import User
 import json
+import multiprocessing
 import os
 import pep8
 import unittest
+from unittest import mock
 FileStorage = file_storage.FileStorage
 classes = {"Amenity": Amenity, "BaseModel": BaseModel, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
@@ -110,3 +113,649 @@ class TestFileStorage(unittest.TestCase):
         with open("file.json", "r") as f:
             js = f.read()
         self.assertEqual(json.loads(string), json.loads(js))
+
+    def test_all_with_class_returns_partition(self):
+        """Test that all(cls) returns the class partition without copying"""
+        storage = FileStorage()
+        state = State()
+        storage.new(state)
+        key = "State." + state.id
+        self.assertIs(storage.all(State), storage.all("State"))
+        self.assertIs(storage.all(State)[key], state)
+        self.assertNotIn(key, storage.all(City))
+        storage.delete(state)
+        self.assertNotIn(key, storage.all(State))
+
+    def test_get(self):
+        """Test that get returns the object matching class and id"""
+        storage = FileStorage()
+        user = User()
+        storage.new(user)
+        self.assertIs(storage.get(User, user.id), user)
+        self.assertIsNone(storage.get(State, user.id))
+        self.assertIsNone(storage.get(User, "not-an-id"))
+        storage.delete(user)
+        self.assertIsNone(storage.get(User, user.id))
+
+    def test_count(self):
+        """Test that count follows new and delete for each class"""
+        storage = FileStorage()
+        count_all = storage.count()
+        count_amenity = storage.count(Amenity)
+        amenity = Amenity()
+        storage.new(amenity)
+        self.assertEqual(storage.count(), count_all + 1)
+        self.assertEqual(storage.count(Amenity), count_amenity + 1)
+        self.assertEqual(storage.count("Amenity"), count_amenity + 1)
+        storage.delete(amenity)
+        self.assertEqual(storage.count(), count_all)
+        self.assertEqual(storage.count(Amenity), count_amenity)
+
+    def test_iter(self):
+        """Test that iter yields the objects of all() and skips deletions"""
+        storage = FileStorage()
+        amenities = [Amenity() for i in range(3)]
+        for amenity in amenities:
+            storage.new(amenity)
+        objs = storage.iter(Amenity)
+        first = next(objs)
+        gone = amenities[1] if first is amenities[2] else amenities[2]
+        storage.delete(gone)
+        rest = list(objs)
+        self.assertNotIn(gone, rest)
+        self.assertCountEqual([first] + rest, storage.all(Amenity).values())
+        self.assertEqual(len(list(storage.iter())), storage.count())
+        for amenity in amenities:
+            storage.delete(amenity)
+
+    @unittest.skipIf(models.storage_t in ('db', 'sqlite'),
+                     "not testing file storage")
+    def test_counts(self):
+        """Test that counts gives the count of every class"""
+        storage = FileStorage()
+        counts = storage.counts()
+        self.assertEqual(sorted(counts), sorted(classes))
+        for name, count in counts.items():
+            self.assertEqual(count, storage.count(name))
+
+    @unittest.skipIf(models.storage_t in ('db', 'sqlite'),
+                     "not testing file storage")
+    def test_generation(self):
+        """Test that the generation of a class moves with its objects only"""
+        storage = FileStorage()
+        state = State(name="California")
+        before = storage.generation(State)
+        amenities = storage.generation("Amenity")
+        storage.new(state)
+        added = storage.generation(State)
+        self.assertNotEqual(added[0], before[0])
+        self.assertIsNotNone(added[1])
+        state.name = "Nevada"
+        changed = storage.generation(State)
+        self.assertNotEqual(changed[0], added[0])
+        storage.delete(state)
+        self.assertNotEqual(storage.generation(State)[0], changed[0])
+        self.assertEqual(storage.generation(Amenity), amenities)
+
+    @unittest.skipIf(models.storage_t in ('db', 'sqlite'),
+                     "not testing file storage")
+    def test_generations(self):
+        """Test that generations returns the generation of each class"""
+        storage = FileStorage()
+        storage.new(State(name="California"))
+        self.assertEqual(storage.generations([State, "Amenity"]),
+                         {"State": storage.generation(State),
+                          "Amenity": storage.generation(Amenity)})
+
+    @unittest.skipIf(models.storage_t in ('db', 'sqlite'),
+                     "not testing file storage")
+    def test_page(self):
+        """Test that page returns the objects after an id, by id"""
+        storage = FileStorage()
+        state = State(name="paged")
+        cities = [City(name=str(i), state_id=state.id) for i in range(5)]
+        for obj in [state] + cities:
+            storage.new(obj)
+        ids = sorted(city.id for city in cities)
+        page = storage.page(City, 2, attr="state_id", value=state.id)
+        self.assertEqual([city.id for city in page], ids[:2])
+        page = storage.page("City", 10, ids[1], "state_id", state.id)
+        self.assertEqual([city.id for city in page], ids[2:])
+        page = storage.page(City, 3)
+        self.assertEqual([city.id for city in page],
+                         sorted(city.id for city in
+                                storage.all(City).values())[:3])
+        for obj in [state] + cities:
+            storage.delete(obj)
+
+    def test_sorted_keys_between_pages(self):
+        """Test that keys added between pages are walked in order without
+        sorting the keys already held again"""
+        keys = file_storage.SortedKeys(["b", "d", "f", "h"])
+        order = keys.order
+        members = {"b", "c", "d", "f", "g", "h"}
+        for key in ["g", "c", "d"]:
+            keys.add(key)
+        self.assertEqual(keys.after(None, 3, members), ["b", "c", "d"])
+        self.assertEqual(keys.after("d", 10, members), ["f", "g", "h"])
+        self.assertIs(keys.order, order)
+        self.assertEqual(keys.added, ["c", "d", "g"])
+        for i in range(100):
+            keys.add("e{:03d}".format(i))
+            members.add("e{:03d}".format(i))
+        members.discard("f")
+        self.assertEqual(keys.after("d", 2, members), ["e000", "e001"])
+        self.assertEqual(keys.added, [])
+        self.assertEqual(keys.after("e099", 10, members), ["g", "h"])
+
+    @unittest.skipIf(models.storage_t in ('db', 'sqlite'),
+                     "not testing file storage")
+    def test_page_follows_changes(self):
+        """Test that pages keep following objects added, deleted and moved
+        after the first page"""
+        storage = FileStorage()
+        state = State(name="paged")
+        other = State(name="other")
+        cities = [City(name=str(i), state_id=state.id) for i in range(6)]
+        for obj in [state, other] + cities:
+            storage.new(obj)
+        storage.page(City, 2, attr="state_id", value=state.id)
+        storage.page(City, 2)
+        added = [City(name="added", state_id=state.id) for i in range(3)]
+        for city in added:
+            storage.new(city)
+        storage.delete(cities[0])
+        cities[1].state_id = other.id
+        storage.delete(added[0])
+        storage.new(added[0])
+        expected = sorted(city.id for city in cities[2:] + added)
+        ids = []
+        after = None
+        while True:
+            page = storage.page(City, 2, after, "state_id", state.id)
+            ids += [city.id for city in page]
+            if len(page) < 2:
+                break
+            after = page[-1].id
+        self.assertEqual(ids, expected)
+        page = storage.page(City, 1000)
+        self.assertEqual([city.id for city in page],
+                         sorted(city.id for city in
+                                storage.all(City).values()))
+        self.assertEqual(storage.page(City, 5, attr="state_id",
+                                      value="missing"), [])
+        for obj in [state, other] + cities[1:] + added:
+            storage.delete(obj)
+
+    @unittest.skipIf(models.storage_t in ('db', 'sqlite'),
+                     "not testing file storage")
+    def test_related(self):
+        """Test that related follows new, delete and attribute updates"""
+        storage = FileStorage()
+        state = State()
+        other = State()
+        city = City(state_id=state.id)
+        storage.new(city)
+        key = "City." + city.id
+        self.assertEqual(storage.related(City, "state_id", state.id),
+                         {key: city})
+        city.state_id = other.id
+        self.assertNotIn(key, storage.related(City, "state_id", state.id))
+        self.assertIn(key, storage.related("City", "state_id", other.id))
+        storage.delete(city)
+        self.assertEqual(storage.related(City, "state_id", other.id), {})
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_relationship_properties(self):
+        """Test the file storage getters of State, City and Place"""
+        storage = models.storage
+        state = State()
+        city = City(state_id=state.id)
+        place = Place(city_id=city.id)
+        review = Review(place_id=place.id)
+        amenity = Amenity()
+        place.amenity_ids = [amenity.id]
+        for obj in [state, city, place, review, amenity]:
+            storage.new(obj)
+        self.assertEqual(state.cities, [city])
+        self.assertEqual(city.places, [place])
+        self.assertEqual(place.reviews, [review])
+        self.assertEqual(place.amenities, [amenity])
+        for obj in [state, city, place, review, amenity]:
+            storage.delete(obj)
+        self.assertEqual(state.cities, [])
+
+
+@unittest.skipIf(models.storage_t in ('db', 'sqlite'),
+                 "not testing file storage")
+class TestFileStorageOnDisk(unittest.TestCase):
+    """Test the FileStorage class against files of its own"""
+    def setUp(self):
+        """Give each test an empty storage writing to its own file"""
+        self.saved = {}
+        for attr in ["objects", "partitions", "relations", "ordered",
+                     "dirty", "touched", "serialized"]:
+            name = "_FileStorage__" + attr
+            self.saved[name] = getattr(FileStorage, name)
+            setattr(FileStorage, name, type(self.saved[name])())
+        self.path = "file_journal_test.json"
+        self.storage = FileStorage()
+        self.storage.journal = True
+        self.storage.journal_ratio = 100
+        self.storage._FileStorage__file_path = self.path
+
+    def tearDown(self):
+        """Restore the storage and remove the files of the test"""
+        for name, value in self.saved.items():
+            setattr(FileStorage, name, value)
+        for suffix in ["", ".log", ".log.old", ".lock", ".compact"]:
+            if os.path.exists(self.path + suffix):
+                os.remove(self.path + suffix)
+        for path in glob.glob(self.path + ".*.tmp"):
+            os.remove(path)
+
+    def reset(self):
+        """Forget every object in memory, as a fresh process would"""
+        for attr in ["objects", "partitions", "relations", "ordered",
+                     "dirty", "touched", "serialized"]:
+            getattr(FileStorage, "_FileStorage__" + attr).clear()
+
+    def test_save_appends_changes_only(self):
+        """Test that save appends one record per changed object"""
+        states = [State(name=str(i)) for i in range(5)]
+        for state in states:
+            self.storage.new(state)
+        self.storage.save()
+        states[0].name = "renamed"
+        self.storage.delete(states[1])
+        self.storage.save()
+        self.storage.save()
+        with open(self.path + ".log", "r") as f:
+            lines = f.readlines()
+        self.assertEqual(len(lines), 7)
+        self.assertEqual(json.loads(lines[-2]).keys() |
+                         json.loads(lines[-1]).keys(),
+                         {"State." + states[0].id, "State." + states[1].id})
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_reload_replays_journal(self):
+        """Test that reload rebuilds the objects from the journal"""
+        state = State(name="California")
+        city = City(name="Fremont", state_id=state.id)
+        self.storage.new(state)
+        self.storage.new(city)
+        self.storage.save()
+        state.name = "Nevada"
+        self.storage.delete(city)
+        self.storage.save()
+        self.reset()
+        self.storage.reload()
+        self.assertEqual(self.storage.get(State, state.id).name, "Nevada")
+        self.assertIsNone(self.storage.get(City, city.id))
+        self.assertEqual(self.storage.count(), 1)
+
+    def test_compact(self):
+        """Test that compact folds the journal into the JSON file"""
+        state = State(name="California")
+        self.storage.new(state)
+        self.storage.save()
+        state.name = "Nevada"
+        self.storage.save()
+        self.storage.compact()
+        self.assertFalse(os.path.exists(self.path + ".log"))
+        with open(self.path, "r") as f:
+            self.assertEqual(json.load(f)["State." + state.id]["name"],
+                             "Nevada")
+        self.reset()
+        self.storage.reload()
+        self.assertEqual(self.storage.get(State, state.id).name, "Nevada")
+
+    def test_save_after_torn_line(self):
+        """Test that a line left unfinished by a crash loses no later save"""
+        state = State(name="California")
+        self.storage.new(state)
+        self.storage.save()
+        with open(self.path + ".log", "ab") as f:
+            f.write(b'{"State.torn": {"name": "Nev')
+        other = State(name="Nevada")
+        self.storage.new(other)
+        self.storage.save()
+        self.reset()
+        self.storage.reload()
+        self.assertEqual(self.storage.get(State, other.id).name, "Nevada")
+        self.assertEqual(self.storage.count(State), 2)
+
+    def test_compact_syncs_before_removing_journal(self):
+        """Test that the JSON file is flushed to disk before the journal
+        it replaces is removed"""
+        state = State(name="California")
+        self.storage.new(state)
+        self.storage.save()
+        events = []
+
+        def fsync(fd):
+            """records the call and whether the journal still exists"""
+            events.append(os.path.exists(self.path + ".log.old"))
+            return real_fsync(fd)
+
+        real_fsync = os.fsync
+        with mock.patch.object(os, "fsync", side_effect=fsync):
+            self.storage.compact()
+        self.assertEqual(events, [True, True])
+        self.assertFalse(os.path.exists(self.path + ".log.old"))
+
+    def test_close_skips_unchanged_file(self):
+        """Test that close only reloads when the files changed on disk"""
+        state = State(name="California")
+        self.storage.new(state)
+        self.storage.save()
+        self.storage.close()
+        self.assertIs(self.storage.get(State, state.id), state)
+        with open(self.path + ".log", "a") as f:
+            f.write(json.dumps({"State." + state.id: None}) + "\n")
+        self.storage.close()
+        self.assertIsNone(self.storage.get(State, state.id))
+
+    def test_save_serializes_changed_objects_only(self):
+        """Test that a full save rebuilds the record of changed objects only"""
+        self.storage.journal = False
+        states = [State(name=str(i)) for i in range(5)]
+        for state in states:
+            self.storage.new(state)
+        self.storage.save()
+        cache = FileStorage._FileStorage__serialized
+        before = dict(cache)
+        states[2].name = "renamed"
+        with mock.patch.object(State, "to_dict") as to_dict:
+            self.storage.save()
+        to_dict.assert_not_called()
+        for state in states:
+            key = "State." + state.id
+            if state is states[2]:
+                self.assertIsNot(cache[key], before[key])
+            else:
+                self.assertIs(cache[key], before[key])
+        with open(self.path, "r") as f:
+            self.assertEqual(json.load(f)["State." + states[2].id]["name"],
+                             "renamed")
+
+    def test_batch_saves_once(self):
+        """Test that saves inside a batch are written once at the end"""
+        self.storage.journal = False
+        with mock.patch.object(FileStorage, "_FileStorage__write",
+                               autospec=True) as write:
+            with self.storage.batch():
+                for i in range(3):
+                    state = State(name=str(i))
+                    self.storage.new(state)
+                    self.storage.save()
+                    with self.storage.batch():
+                        self.storage.save()
+                self.assertEqual(write.call_count, 0)
+            self.assertEqual(write.call_count, 1)
+            with self.assertRaises(ValueError):
+                with self.storage.batch():
+                    self.storage.save()
+                    raise ValueError
+            self.assertEqual(write.call_count, 1)
+
+    def test_batch_rolls_back_on_error(self):
+        """Test that a batch raising puts back the objects it changed"""
+        self.storage.journal = False
+        state = State(name="California")
+        city = City(name="Fremont", state_id=state.id)
+        for obj in [state, city]:
+            self.storage.new(obj)
+        self.storage.save()
+        other = State(name="Nevada")
+        with self.assertRaises(ValueError):
+            with self.storage.batch():
+                state.name = "Arizona"
+                state.save()
+                city.state_id = other.id
+                self.storage.new(other)
+                self.storage.delete(city)
+                raise ValueError
+        self.assertEqual(state.name, "California")
+        self.assertIs(self.storage.get(City, city.id), city)
+        self.assertEqual(city.state_id, state.id)
+        self.assertIsNone(self.storage.get(State, other.id))
+        self.assertEqual(list(self.storage.related(City, "state_id",
+                                                   state.id)),
+                         ["City." + city.id])
+        self.storage.save()
+        self.reset()
+        self.storage.reload()
+        self.assertEqual(self.storage.get(State, state.id).name, "California")
+        self.assertEqual(self.storage.count(), 2)
+
+    def test_bulk_new_writes_once(self):
+        """Test that bulk_new adds every object and writes the file once"""
+        self.storage.journal = False
+        states = [State(name=str(i)) for i in range(5)]
+        with mock.patch.object(FileStorage, "_FileStorage__write",
+                               autospec=True,
+                               side_effect=FileStorage._FileStorage__write
+                               ) as write:
+            stats = self.storage.bulk_new(iter(states), chunk_size=2)
+            self.assertEqual(write.call_count, 1)
+        self.assertEqual(stats["rows"], 5)
+        self.assertGreater(stats["rows_per_second"], 0)
+        self.reset()
+        self.storage.reload()
+        self.assertEqual(self.storage.count(State), 5)
+
+    def test_shared_processes_lose_no_update(self):
+        """Test that processes writing the same file keep each other's data"""
+        def worker(journal):
+            """saves states one at a time, as an API worker would"""
+            storage = FileStorage()
+            storage.shared = True
+            storage.journal = journal
+            storage._FileStorage__file_path = self.path
+            storage.reload()
+            for i in range(25):
+                storage.new(State(name="shared"))
+                storage.save()
+                storage.close()
+
+        ctx = multiprocessing.get_context("fork")
+        for journal in [False, True]:
+            with self.subTest(journal=journal):
+                self.tearDown()
+                self.setUp()
+                workers = [ctx.Process(target=worker, args=(journal,))
+                           for n in range(3)]
+                for process in workers:
+                    process.start()
+                for process in workers:
+                    process.join()
+                    self.assertEqual(process.exitcode, 0)
+                self.storage.reload()
+                self.assertEqual(self.storage.count(State), 75)
+
+    def shared_storage(self, journal, journal_ratio=1.0):
+        """returns a storage sharing the file of the test"""
+        storage = FileStorage()
+        storage.shared = True
+        storage.journal = journal
+        storage.journal_ratio = journal_ratio
+        storage._FileStorage__file_path = self.path
+        return storage
+
+    def test_shared_processes_merge_updates(self):
+        """Test that a process saving a stale object keeps what another one
+        saved to its other attributes, and drops what it deleted"""
+        def writer(journal, id, deleted_id):
+            """updates one state and deletes another in another process"""
+            storage = self.shared_storage(journal)
+            storage.get(State, id).name = "fromA"
+            storage.delete(storage.get(State, deleted_id))
+            storage.save()
+
+        ctx = multiprocessing.get_context("fork")
+        for journal in [False, True]:
+            with self.subTest(journal=journal):
+                self.tearDown()
+                self.setUp()
+                storage = self.shared_storage(journal, 100)
+                state = State(name="orig")
+                deleted = State(name="deleted")
+                for obj in [state, deleted]:
+                    storage.new(obj)
+                storage.save()
+                process = ctx.Process(target=writer,
+                                      args=(journal, state.id, deleted.id))
+                process.start()
+                process.join()
+                self.assertEqual(process.exitcode, 0)
+                state.note = "fromB"
+                deleted.name = "fromB"
+                storage.save()
+                self.assertEqual(state.name, "fromA")
+                self.assertIsNone(storage.get(State, deleted.id))
+                self.reset()
+                storage.reload()
+                loaded = storage.get(State, state.id)
+                self.assertEqual((loaded.name, loaded.note),
+                                 ("fromA", "fromB"))
+                self.assertEqual(storage.count(State), 1)
+
+    def test_shared_processes_update_same_object(self):
+        """Test that processes updating one object lose none of the updates
+        """
+        def worker(journal, id, attr):
+            """sets attr of the state again and again, as an API worker"""
+            storage = self.shared_storage(journal)
+            for i in range(25):
+                storage.refresh()
+                state = storage.get(State, id)
+                setattr(state, attr, i)
+                storage.save()
+
+        ctx = multiprocessing.get_context("fork")
+        for journal in [False, True]:
+            with self.subTest(journal=journal):
+                self.tearDown()
+                self.setUp()
+                storage = self.shared_storage(journal, 100)
+                state = State(name="orig")
+                storage.new(state)
+                storage.save()
+                attrs = ["a", "b", "c"]
+                workers = [ctx.Process(target=worker,
+                                       args=(journal, state.id, attr))
+                           for attr in attrs]
+                for process in workers:
+                    process.start()
+                for process in workers:
+                    process.join()
+                    self.assertEqual(process.exitcode, 0)
+                self.reset()
+                storage.reload()
+                loaded = storage.get(State, state.id)
+                self.assertEqual([getattr(loaded, attr, None)
+                                  for attr in attrs], [24, 24, 24])
+
+    def test_lazy_reload(self):
+        """Test that lazy mode only builds the objects looked up"""
+        state = State(name="California")
+        cities = [City(name=str(i), state_id=state.id) for i in range(3)]
+        for obj in [state] + cities:
+            self.storage.new(obj)
+        self.storage.save()
+        self.reset()
+        with mock.patch.dict(os.environ, {"HBNB_FILE_LAZY": "1"}):
+            storage = FileStorage()
+        storage._FileStorage__file_path = self.path
+        storage.reload()
+        objects = FileStorage._FileStorage__objects
+        self.assertEqual(storage.count(City), 3)
+        self.assertIn("State." + state.id, storage.all())
+        self.assertTrue(all(type(value) is dict
+                            for value in dict.values(objects)))
+        loaded = storage.get(State, state.id)
+        self.assertIsInstance(loaded, State)
+        self.assertIs(storage.get(State, state.id), loaded)
+        self.assertIs(type(dict.get(objects, "City." + cities[0].id)), dict)
+        self.assertEqual(len(loaded.cities), 3)
+        loaded.name = "Nevada"
+        storage.save()
+        self.reset()
+        storage.reload()
+        self.assertEqual(storage.get(State, state.id).name, "Nevada")
+        self.assertEqual(storage.count(City), 3)
+
+    def test_lazy_copies_hold_objects(self):
+        """Test that copies and removals in lazy mode give objects only"""
+        states = [State(name=str(i)) for i in range(6)]
+        for state in states:
+            self.storage.new(state)
+        self.storage.save()
+        self.reset()
+        with mock.patch.dict(os.environ, {"HBNB_FILE_LAZY": "1"}):
+            storage = FileStorage()
+        storage._FileStorage__file_path = self.path
+        storage.reload()
+        objects = storage.all(State)
+        merged = {}
+        merged.update(objects)
+        for copy in [dict(objects), objects.copy(), {**objects}, merged]:
+            self.assertEqual(len(copy), 6)
+            self.assertTrue(all(type(value) is State
+                                for value in copy.values()))
+        key = "State." + states[0].id
+        self.assertIsInstance(objects.setdefault(key), State)
+        self.assertIsInstance(objects.pop(key), State)
+        self.assertIsInstance(objects.popitem()[1], State)
+
+    def test_codec_change_keeps_objects(self):
+        """Test that a file written with one codec is read with another"""
+        from models.engine.file_storage import codecs
+        self.storage.journal = False
+        states = [State(name=str(i)) for i in range(3)]
+        for state in states:
+            self.storage.new(state)
+        self.storage.save()
+        for name in codecs:
+            with self.subTest(codec=name):
+                with mock.patch.dict(os.environ, {"HBNB_FILE_CODEC": name}):
+                    storage = FileStorage()
+                storage._FileStorage__file_path = self.path
+                self.reset()
+                storage.reload()
+                self.assertEqual(storage.count(State), len(states))
+                state = State(name="new")
+                states.append(state)
+                storage.new(state)
+                storage.save()
+                self.reset()
+                storage.reload()
+                self.assertEqual(storage.count(State), len(states))
+
+    def test_undecodable_file_raises(self):
+        """Test that reload refuses a file no codec can read, and keeps it"""
+        with open(self.path, "wb") as f:
+            f.write(b"\xc1 not a file of objects")
+        self.assertRaises(ValueError, self.storage.reload)
+        with open(self.path, "rb") as f:
+            self.assertEqual(f.read(), b"\xc1 not a file of objects")
+
+    def test_codecs(self):
+        """Test that every available codec saves and reloads the objects"""
+        from models.engine.file_storage import codecs
+        for name in codecs:
+            with self.subTest(codec=name):
+                with mock.patch.dict(os.environ, {"HBNB_FILE_CODEC": name}):
+                    storage = FileStorage()
+                storage._FileStorage__file_path = self.path
+                self.reset()
+                state = State(name="California")
+                storage.new(state)
+                storage.save()
+                self.reset()
+                storage.reload()
+                loaded = storage.get(State, state.id)
+                self.assertEqual(loaded.name, "California")
+                self.assertEqual(loaded.created_at, state.created_at)
+                self.assertEqual(loaded.updated_at, state.updated_at)
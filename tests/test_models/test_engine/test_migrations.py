@@ -0,0 +1,148 @@
+#!/usr/bin/python3
+"""
+Contains the TestMigrationsDocs and TestMigrations classes
+"""
+
+import inspect
+import models
+from models.engine import migrations
+import os
+import pep8
+import sqlalchemy
+from sqlalchemy import Column, ForeignKey, Integer, MetaData, String, Table
+import subprocess
+import sys
+import unittest
+
+
+class TestMigrationsDocs(unittest.TestCase):
+    """Tests to check the documentation and style of the migrations module"""
+    def test_pep8_conformance(self):
+        """Test that migrations.py and its tests conform to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files([
+            'models/engine/migrations.py',
+            'tests/test_models/test_engine/test_migrations.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_module_docstring(self):
+        """Test for the migrations.py module docstring"""
+        self.assertIsNot(migrations.__doc__, None,
+                         "migrations.py needs a docstring")
+        self.assertTrue(len(migrations.__doc__) >= 1,
+                        "migrations.py needs a docstring")
+
+    def test_func_docstrings(self):
+        """Test for the presence of docstrings in the module functions"""
+        for func in inspect.getmembers(migrations, inspect.isfunction):
+            if func[1].__module__ != migrations.__name__:
+                continue
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} function needs a docstring".format(func[0]))
+            self.assertTrue(len(func[1].__doc__) >= 1,
+                            "{:s} function needs a docstring".format(func[0]))
+
+
+class TestMigrations(unittest.TestCase):
+    """Test the migrations against a SQLite file of an older schema"""
+    path = "file_migrations_test.db"
+
+    def setUp(self):
+        """Create a database holding the first version of two tables"""
+        self.engine = sqlalchemy.create_engine("sqlite:///" + self.path)
+        old = MetaData()
+        Table("states", old, Column("id", String(60), primary_key=True))
+        Table("cities", old, Column("id", String(60), primary_key=True),
+              Column("state_id", String(60)))
+        old.create_all(self.engine)
+        with self.engine.begin() as conn:
+            conn.exec_driver_sql("INSERT INTO cities VALUES ('c', 's')")
+
+    def tearDown(self):
+        """Dispose of the engine and remove its file"""
+        self.engine.dispose()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def current(self):
+        """returns the current version of the schema"""
+        metadata = MetaData()
+        Table("states", metadata, Column("id", String(60), primary_key=True))
+        Table("cities", metadata, Column("id", String(60), primary_key=True),
+              Column("state_id", String(60), ForeignKey("states.id"),
+                     index=True),
+              Column("name", String(128), nullable=False),
+              Column("rank", Integer, nullable=False, server_default="0"))
+        Table("users", metadata, Column("id", String(60), primary_key=True),
+              Column("email", String(128), index=True))
+        return metadata
+
+    def test_plan(self):
+        """Test that only the missing tables, columns and indexes are planned
+        """
+        statements = migrations.plan(self.engine, self.current())
+        created = [statement for statement in statements
+                   if statement.startswith("CREATE TABLE")]
+        self.assertEqual(len(created), 1)
+        self.assertTrue(created[0].startswith("CREATE TABLE users"))
+        self.assertCountEqual(
+            [statement for statement in statements
+             if not statement.startswith("CREATE TABLE")],
+            ["ALTER TABLE cities ADD COLUMN name VARCHAR(128)",
+             "ALTER TABLE cities ADD COLUMN rank INTEGER DEFAULT '0' NOT NULL",
+             "CREATE INDEX ix_cities_state_id ON cities (state_id)",
+             "CREATE INDEX ix_users_email ON users (email)"])
+
+    def test_migrate(self):
+        """Test that migrate keeps the data and leaves nothing to do"""
+        metadata = self.current()
+        self.assertEqual(migrations.migrate(self.engine, metadata, True),
+                         migrations.plan(self.engine, metadata))
+        self.assertEqual(len(migrations.plan(self.engine, metadata)), 5)
+        migrations.migrate(self.engine, metadata)
+        self.assertEqual(migrations.plan(self.engine, metadata), [])
+        with self.engine.connect() as conn:
+            rows = conn.exec_driver_sql("SELECT * FROM cities").fetchall()
+        self.assertEqual([tuple(row) for row in rows], [("c", "s", None, 0)])
+
+    def run_command(self, *args, **env):
+        """runs the migrations command on the database of the test"""
+        env = dict(os.environ, HBNB_TYPE_STORAGE="db",
+                   HBNB_DB_URL="sqlite:///" + self.path, **env)
+        env.pop("HBNB_ENV", None)
+        return subprocess.run(
+            [sys.executable, "-m", "models.engine.migrations"] + list(args),
+            env=env, capture_output=True, text=True)
+
+    def schema(self):
+        """returns the statements creating the schema of the database"""
+        with self.engine.connect() as conn:
+            return conn.exec_driver_sql(
+                "SELECT sql FROM sqlite_master ORDER BY name").fetchall()
+
+    def test_command(self):
+        """Test that the command prints the statements without running
+        them on --dry-run, and runs them otherwise"""
+        schema = self.schema()
+        result = self.run_command("--dry-run", HBNB_STORAGE_RELOAD="0")
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn("CREATE TABLE generations", result.stdout)
+        self.assertIn("ALTER TABLE cities ADD COLUMN name", result.stdout)
+        self.assertEqual(self.schema(), schema)
+        result = self.run_command(HBNB_STORAGE_RELOAD="0")
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertNotEqual(self.schema(), schema)
+        result = self.run_command("--dry-run", HBNB_STORAGE_RELOAD="0")
+        self.assertEqual(result.stdout, "")
+
+    def test_command_needs_no_reload(self):
+        """Test that the command refuses to run after reloading storage"""
+        result = self.run_command("--dry-run", HBNB_STORAGE_RELOAD="1")
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn("HBNB_STORAGE_RELOAD", result.stderr)
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_storage_schema(self):
+        """Test that a database created by DBStorage needs no migration"""
+        self.assertEqual(models.storage.migrate(dry_run=True), [])
@@ -0,0 +1,98 @@
+#!/usr/bin/python3
+"""
+Contains the TestPoolDocs and TestInstrumentedQueuePool classes
+"""
+
+import inspect
+from models.engine import pool
+import os
+import pep8
+import sqlalchemy
+import threading
+import unittest
+InstrumentedQueuePool = pool.InstrumentedQueuePool
+
+
+class TestPoolDocs(unittest.TestCase):
+    """Tests to check the documentation and style of the pool module"""
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.pool_f = [(name, func) for name, func
+                      in vars(InstrumentedQueuePool).items()
+                      if inspect.isfunction(func)]
+
+    def test_pep8_conformance(self):
+        """Test that pool.py and its tests conform to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files([
+            'models/engine/pool.py',
+            'tests/test_models/test_engine/test_pool.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_module_docstring(self):
+        """Test for the pool.py module docstring"""
+        self.assertIsNot(pool.__doc__, None, "pool.py needs a docstring")
+        self.assertTrue(len(pool.__doc__) >= 1, "pool.py needs a docstring")
+
+    def test_class_docstring(self):
+        """Test for the InstrumentedQueuePool class docstring"""
+        self.assertIsNot(InstrumentedQueuePool.__doc__, None,
+                         "InstrumentedQueuePool class needs a docstring")
+        self.assertTrue(len(InstrumentedQueuePool.__doc__) >= 1,
+                        "InstrumentedQueuePool class needs a docstring")
+
+    def test_func_docstrings(self):
+        """Test for the presence of docstrings in the pool methods"""
+        for func in self.pool_f:
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} method needs a docstring".format(func[0]))
+            self.assertTrue(len(func[1].__doc__) >= 1,
+                            "{:s} method needs a docstring".format(func[0]))
+
+
+class TestInstrumentedQueuePool(unittest.TestCase):
+    """Test the InstrumentedQueuePool class on a SQLite file"""
+    path = "file_pool_test.db"
+
+    def setUp(self):
+        """Create an engine holding a single connection"""
+        self.engine = sqlalchemy.create_engine(
+            "sqlite:///" + self.path, poolclass=InstrumentedQueuePool,
+            pool_size=1, max_overflow=0, pool_timeout=0.05,
+            connect_args={"check_same_thread": False})
+
+    def tearDown(self):
+        """Dispose of the engine and remove its file"""
+        self.engine.dispose()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def test_checkouts(self):
+        """Test that checkouts are counted and spread in the histogram"""
+        for i in range(3):
+            with self.engine.connect() as conn:
+                conn.exec_driver_sql("SELECT 1")
+        stats = self.engine.pool.stats()
+        self.assertEqual(stats["checkouts"], 3)
+        self.assertEqual(sum(bucket["count"]
+                             for bucket in stats["histogram_ms"]), 3)
+        self.assertEqual(stats["histogram_ms"][-1]["le"], "+Inf")
+        self.assertEqual(stats["checked_out"], 0)
+        self.assertEqual(stats["timeouts"], 0)
+        self.assertLessEqual(stats["wait_ms"]["mean"],
+                             stats["wait_ms"]["max"])
+
+    def test_wait_and_timeout(self):
+        """Test that waiting for a connection is timed, or counted apart"""
+        conn = self.engine.connect()
+        self.assertEqual(self.engine.pool.stats()["checked_out"], 1)
+        with self.assertRaises(sqlalchemy.exc.TimeoutError):
+            self.engine.connect()
+        self.assertEqual(self.engine.pool.stats()["timeouts"], 1)
+        threading.Timer(0.02, conn.close).start()
+        self.engine.connect().close()
+        stats = self.engine.pool.stats()
+        self.assertEqual(stats["checkouts"], 2)
+        self.assertGreaterEqual(stats["wait_ms"]["max"], 10)
@@ -0,0 +1,94 @@
+#!/usr/bin/python3
+"""
+Contains the TestRWLockDocs and TestRWLock classes
+"""
+
+import inspect
+from models.engine import rwlock
+import pep8
+import threading
+import unittest
+RWLock = rwlock.RWLock
+
+
+class TestRWLockDocs(unittest.TestCase):
+    """Tests to check the documentation and style of RWLock class"""
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.rw_f = inspect.getmembers(RWLock, inspect.isfunction)
+
+    def test_pep8_conformance_rwlock(self):
+        """Test that models/engine/rwlock.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/rwlock.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_rwlock(self):
+        """Test tests/test_models/test_engine/test_rwlock.py conforms"""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_models/test_engine/\
+test_rwlock.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_rwlock_module_docstring(self):
+        """Test for the rwlock.py module docstring"""
+        self.assertIsNot(rwlock.__doc__, None,
+                         "rwlock.py needs a docstring")
+        self.assertTrue(len(rwlock.__doc__) >= 1,
+                        "rwlock.py needs a docstring")
+
+    def test_rwlock_func_docstrings(self):
+        """Test for the presence of docstrings in RWLock methods"""
+        for func in self.rw_f:
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} method needs a docstring".format(func[0]))
+
+
+class TestRWLock(unittest.TestCase):
+    """Test the RWLock class"""
+    def test_readers_share_the_lock(self):
+        """Test that a reader does not wait for another reader"""
+        lock = RWLock()
+        entered = threading.Event()
+
+        def reader():
+            """takes the lock for reading"""
+            with lock.read():
+                entered.set()
+
+        with lock.read():
+            thread = threading.Thread(target=reader)
+            thread.start()
+            self.assertTrue(entered.wait(1))
+        thread.join()
+
+    def test_writer_excludes_readers(self):
+        """Test that a reader waits until the writer is done"""
+        lock = RWLock()
+        entered = threading.Event()
+
+        def reader():
+            """takes the lock for reading"""
+            with lock.read():
+                entered.set()
+
+        with lock.write():
+            thread = threading.Thread(target=reader)
+            thread.start()
+            self.assertFalse(entered.wait(0.1))
+        self.assertTrue(entered.wait(1))
+        thread.join()
+
+    def test_writer_reenters(self):
+        """Test that the writer can take the lock again"""
+        lock = RWLock()
+        with lock.write():
+            with lock.write():
+                with lock.read():
+                    pass
+        with lock.read():
+            with lock.read():
+                pass
@@ -0,0 +1,311 @@
+#!/usr/bin/python3
+"""
+Contains the TestSQLiteStorageDocs and TestSQLiteStorage classes
+"""
+
+import inspect
+import models
+from models.engine import sqlite_storage
+from models.city import City
+from models.place import Place
+from models.state import State
+from models.user import User
+import os
+import pep8
+import threading
+import unittest
+SQLiteStorage = sqlite_storage.SQLiteStorage
+
+
+class TestSQLiteStorageDocs(unittest.TestCase):
+    """Tests to check the documentation and style of SQLiteStorage class"""
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.sqs_f = inspect.getmembers(SQLiteStorage, inspect.isfunction)
+
+    def test_pep8_conformance_sqlite_storage(self):
+        """Test that models/engine/sqlite_storage.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/sqlite_storage.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_sqlite_storage(self):
+        """Test tests/test_models/test_sqlite_storage.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_models/test_engine/\
+test_sqlite_storage.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_sqlite_storage_module_docstring(self):
+        """Test for the sqlite_storage.py module docstring"""
+        self.assertIsNot(sqlite_storage.__doc__, None,
+                         "sqlite_storage.py needs a docstring")
+        self.assertTrue(len(sqlite_storage.__doc__) >= 1,
+                        "sqlite_storage.py needs a docstring")
+
+    def test_sqlite_storage_class_docstring(self):
+        """Test for the SQLiteStorage class docstring"""
+        self.assertIsNot(SQLiteStorage.__doc__, None,
+                         "SQLiteStorage class needs a docstring")
+        self.assertTrue(len(SQLiteStorage.__doc__) >= 1,
+                        "SQLiteStorage class needs a docstring")
+
+    def test_sqs_func_docstrings(self):
+        """Test for the presence of docstrings in SQLiteStorage methods"""
+        for func in self.sqs_f:
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} method needs a docstring".format(func[0]))
+            self.assertTrue(len(func[1].__doc__) >= 1,
+                            "{:s} method needs a docstring".format(func[0]))
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing sqlite storage")
+class TestSQLiteStorage(unittest.TestCase):
+    """Test the SQLiteStorage class"""
+    path = "file_sqlite_test.db"
+
+    def setUp(self):
+        """Opens a storage on an empty file"""
+        self.storage = self.open()
+        self.saved_storage = models.storage
+        models.storage = self.storage
+
+    def tearDown(self):
+        """Closes the storage and removes its files"""
+        models.storage = self.saved_storage
+        self.storage.close()
+        for suffix in ["", "-wal", "-shm"]:
+            if os.path.exists(self.path + suffix):
+                os.remove(self.path + suffix)
+
+    def open(self):
+        """returns a new storage on the test file"""
+        storage = SQLiteStorage()
+        storage._SQLiteStorage__file_path = self.path
+        storage.reload()
+        return storage
+
+    def test_wal_mode(self):
+        """Test that the file runs in WAL mode"""
+        conn = self.storage._SQLiteStorage__connection()
+        mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode, "wal")
+
+    def test_save_and_reopen(self):
+        """Test that saved objects are found by another storage"""
+        state = State(name="California")
+        self.storage.new(state)
+        self.storage.save()
+        other = self.open()
+        found = other.get(State, state.id)
+        self.assertIsNot(found, state)
+        self.assertEqual(found.to_dict(), state.to_dict())
+        self.assertEqual(list(other.all(State)), ["State." + state.id])
+        self.assertEqual(list(other.all("State")), ["State." + state.id])
+        other.close()
+
+    def test_unsaved_changes(self):
+        """Test that unsaved objects are seen by the thread, not by count"""
+        state = State(name="California")
+        self.storage.new(state)
+        self.assertIs(self.storage.get(State, state.id), state)
+        self.assertIn("State." + state.id, self.storage.all())
+        self.assertEqual(self.storage.count(State), 0)
+        self.storage.save()
+        self.assertEqual(self.storage.count(State), 1)
+        self.storage.delete(state)
+        self.assertIsNone(self.storage.get(State, state.id))
+        self.assertNotIn("State." + state.id, self.storage.all(State))
+        self.storage.save()
+        self.assertEqual(self.storage.count(), 0)
+
+    def test_identity_map(self):
+        """Test that a key is always loaded as the same instance"""
+        state = State(name="California")
+        self.storage.new(state)
+        self.storage.save()
+        other = self.open()
+        found = other.get(State, state.id)
+        self.assertIs(other.get(State, state.id), found)
+        self.assertIs(other.all(State)["State." + state.id], found)
+        other.close()
+        self.assertIsNot(other.get(State, state.id), found)
+        other.close()
+
+    def test_iter(self):
+        """Test that iter streams saved rows and the thread's changes"""
+        states = [State(name=str(i)) for i in range(5)]
+        for state in states:
+            self.storage.new(state)
+        self.storage.save()
+        self.storage.close()
+        self.assertEqual(len(list(self.storage.iter(State, 2))), 5)
+        self.assertEqual(len(self.storage._SQLiteStorage__objects()), 0)
+        found = self.storage.get(State, states[0].id)
+        self.assertIn(found, list(self.storage.iter("State")))
+        self.storage.delete(found)
+        nevada = State(name="Nevada")
+        self.storage.new(nevada)
+        ids = [state.id for state in self.storage.iter(State, 2)]
+        self.assertNotIn(states[0].id, ids)
+        self.assertIn(nevada.id, ids)
+        self.assertEqual(len(ids), 5)
+        self.assertEqual(list(self.storage.iter(City)), [])
+
+    def test_tracked_changes(self):
+        """Test that changes to loaded objects are written on save"""
+        state = State(name="California")
+        self.storage.new(state)
+        self.storage.save()
+        self.storage.close()
+        self.storage.get(State, state.id).name = "Nevada"
+        self.storage.save()
+        self.storage.close()
+        self.assertEqual(self.storage.get(State, state.id).name, "Nevada")
+
+    def test_count(self):
+        """Test that count counts the rows of one or all tables"""
+        for i in range(3):
+            self.storage.new(State(name=str(i)))
+        self.storage.new(User(email="a@b.c", password="pwd"))
+        self.storage.save()
+        self.assertEqual(self.storage.count(State), 3)
+        self.assertEqual(self.storage.count("User"), 1)
+        self.assertEqual(self.storage.count(City), 0)
+        self.assertEqual(self.storage.count(), 4)
+        self.assertEqual(self.storage.count("Unknown"), 0)
+
+    def test_counts(self):
+        """Test that the counts kept by triggers follow every write"""
+        states = [State(name=str(i)) for i in range(3)]
+        self.storage.bulk_new(states)
+        states[0].name = "changed"
+        self.storage.delete(states[1])
+        self.storage.save()
+        counts = self.storage.counts()
+        self.assertEqual(counts["State"], 2)
+        self.assertEqual(counts["City"], 0)
+        self.assertEqual(sorted(counts), sorted(sqlite_storage.classes))
+        conn = self.storage._SQLiteStorage__connection()
+        conn.execute("DROP TABLE counts")
+        self.storage.reload()
+        self.assertEqual(self.storage.counts()["State"], 2)
+
+    def test_related(self):
+        """Test that related and the relationship properties use the index"""
+        california = State(name="California")
+        nevada = State(name="Nevada")
+        cities = [City(name=str(i), state_id=california.id) for i in range(3)]
+        for obj in [california, nevada] + cities:
+            self.storage.new(obj)
+        self.storage.save()
+        conn = self.storage._SQLiteStorage__connection()
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM City "
+            "WHERE json_extract(data, '$.state_id') = ?", ("x",)).fetchall()
+        self.assertIn("City_state_id", str(plan))
+        self.assertCountEqual([city.id for city in california.cities],
+                              [city.id for city in cities])
+        self.assertEqual(nevada.cities, [])
+        cities[0].state_id = nevada.id
+        self.assertEqual([city.id for city in nevada.cities], [cities[0].id])
+        self.assertEqual(len(california.cities), 2)
+
+    def test_generation(self):
+        """Test that saves bump the generation of the classes they write"""
+        self.assertEqual(self.storage.generation(State), ("0", None))
+        state = State(name="California")
+        self.storage.new(state)
+        self.assertEqual(self.storage.generation(State), ("0", None))
+        self.storage.save()
+        saved = self.storage.generation(State)
+        self.assertIsNotNone(saved[1])
+        other = self.open()
+        other.delete(other.get(State, state.id))
+        other.save()
+        other.close()
+        self.assertNotEqual(self.storage.generation(State)[0], saved[0])
+        self.assertEqual(self.storage.generation(City), ("0", None))
+
+    def test_generations(self):
+        """Test that generations reads several classes at once"""
+        self.storage.new(State(name="California"))
+        self.storage.save()
+        found = self.storage.generations([State, "City", "Nope"])
+        self.assertEqual(found, {"State": self.storage.generation(State),
+                                 "City": ("0", None),
+                                 "Nope": ("0", None)})
+        self.assertIsNotNone(found["State"][1])
+
+    def test_page(self):
+        """Test that page orders saved and pending objects by id"""
+        state = State(name="California")
+        cities = [City(name=str(i), state_id=state.id) for i in range(5)]
+        for obj in [state] + cities:
+            self.storage.new(obj)
+        self.storage.save()
+        ids = sorted(city.id for city in cities)
+        page = self.storage.page(City, 2, attr="state_id", value=state.id)
+        self.assertEqual([city.id for city in page], ids[:2])
+        self.storage.delete(self.storage.get(City, ids[2]))
+        self.storage.get(City, ids[3]).state_id = "other"
+        self.storage.new(self.storage.get(City, ids[3]))
+        city = City(name="new", state_id=state.id)
+        self.storage.new(city)
+        page = self.storage.page("City", 10, ids[1], "state_id", state.id)
+        self.assertEqual([obj.id for obj in page],
+                         sorted(id for id in [ids[4], city.id] if id > ids[1]))
+        self.assertEqual(len(self.storage.page(City, 10)), 5)
+        self.assertEqual(self.storage.page("Unknown", 10), [])
+
+    def test_batch(self):
+        """Test that batch writes once, and drops changes on errors"""
+        with self.storage.batch():
+            for i in range(3):
+                State(name=str(i)).save()
+            self.assertEqual(self.storage.count(State), 0)
+        self.assertEqual(self.storage.count(State), 3)
+        with self.assertRaises(KeyError):
+            with self.storage.batch():
+                State(name="lost").save()
+                raise KeyError
+        self.storage.save()
+        self.assertEqual(self.storage.count(State), 3)
+
+    def test_bulk_new(self):
+        """Test that bulk_new writes each chunk in its own transaction"""
+        states = [State(name=str(i)) for i in range(5)]
+        self.storage.delete(states[0])
+        conn = self.storage._SQLiteStorage__connection()
+        statements = []
+        conn.set_trace_callback(statements.append)
+        stats = self.storage.bulk_new(iter(states), chunk_size=2)
+        conn.set_trace_callback(None)
+        self.assertEqual(statements.count("COMMIT"), 3)
+        self.assertEqual(stats["rows"], 5)
+        self.assertGreater(stats["rows_per_second"], 0)
+        self.assertEqual(self.storage.count(State), 5)
+        self.storage.save()
+        self.assertEqual(self.storage.count(State), 5)
+        with self.storage.batch():
+            self.storage.bulk_new([State(name="Nevada")])
+            self.assertEqual(self.storage.count(State), 5)
+        self.assertEqual(self.storage.count(State), 6)
+
+    def test_threads(self):
+        """Test that threads write through their own connections"""
+        def work():
+            """saves states, then closes the thread's storage"""
+            for i in range(10):
+                State(name=str(i)).save()
+            self.storage.close()
+
+        threads = [threading.Thread(target=work) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.storage.count(State), 40)